@@ -1,28 +1,213 @@
+import csv
+from itertools import chain
+from math import ceil
+
 from django.contrib import admin
-from .models import Doctor, Patient, Appointment, PatientDischargeDetails, Feedback
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
+from .models import Doctor, Patient, Appointment, PatientDischargeDetails, Feedback, EmailOutbox, RoomRate, BillLineItem, Ward, Bed, BedAssignment, AuditLog
+
+
+# Changelists of the big tables. The paginator counts at most CAP rows and
+# there is no second COUNT(*) for the unfiltered total, so a page costs the
+# same at millions of rows; filters, searches and sorting only use indexed columns.
+class AtLeast(int):
+    # A count that stopped at the cap; shown as "10000+", not as an exact total
+    def __str__(self):
+        return f'{int(self)}+'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Exact below CAP rows. Above that, count is AtLeast(CAP) and pages are not
+    bounded by it: a page exists if it has rows, and the page links reach one
+    past the current page while there are more, so every row can be paged to.
+    """
+    CAP = 10000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reached = 0  # last page known to have rows, once past the cap
+
+    @cached_property
+    def count(self):
+        count = self.object_list[:self.CAP + 1].count()
+        return AtLeast(self.CAP) if count > self.CAP else count
+
+    @property
+    def num_pages(self):
+        if self.count == 0 and not self.allow_empty_first_page:
+            return 0
+        pages = ceil(max(1, self.count - self.orphans) / self.per_page)
+        return max(pages, self._reached) if isinstance(self.count, AtLeast) else pages
+
+    def page(self, number):
+        if not isinstance(self.count, AtLeast):
+            return super().page(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        bottom = (number - 1) * self.per_page
+        # One narrow query tells whether this page has rows and whether another follows
+        found = self.object_list[bottom:bottom + self.per_page + 1].count()
+        if not found:
+            raise EmptyPage(self.error_messages['no_results'])
+        self._reached = number + 1 if found > self.per_page else number
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class _Echo:
+    # csv.writer target that hands each row back instead of buffering it
+    def write(self, value):
+        return value
+
+
+@admin.action(description='Export selected rows as CSV')
+def export_csv(modeladmin, request, queryset):
+    # Streamed in chunks, so exporting every row doesn't load them all at once
+    fields = modeladmin.csv_fields
+    writer = csv.writer(_Echo())
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=2000)
+    response = StreamingHttpResponse((writer.writerow(row) for row in chain([fields], rows)), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{queryset.model._meta.model_name}.csv"'
+    return response
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    actions = [export_csv]
+    csv_fields = ()
+    # A number typed in the search box is matched against these indexed id
+    # columns instead of running LIKE over the search_fields
+    search_id_fields = ('id',)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit():
+            match = Q()
+            for field in self.search_id_fields:
+                match |= Q(**{field: int(term)})
+            return queryset.filter(match), False
+        return super().get_search_results(request, queryset, search_term)
+
 
 # Doctor
-class DoctorAdmin(admin.ModelAdmin):
-    pass
+class DoctorAdmin(LargeTableAdmin):
+    list_display = ('name', 'department', 'mobile', 'status')
+    list_select_related = ('user',)
+    list_filter = ('status', 'department')
+    search_fields = ('^user__first_name', '^user__last_name', '=user__username')
+    search_id_fields = ('id', 'user__id')
+    sortable_by = ('department',)
+    autocomplete_fields = ('user',)
+    csv_fields = ('id', 'user__id', 'user__first_name', 'user__last_name', 'department', 'mobile', 'address', 'status')
+
+    @admin.display(description='Name')
+    def name(self, obj):
+        return obj.get_name
 admin.site.register(Doctor, DoctorAdmin)
 
 # Patient
-class PatientAdmin(admin.ModelAdmin):
-    pass
+class PatientAdmin(LargeTableAdmin):
+    list_display = ('name', 'mobile', 'symptoms', 'assignedDoctorId', 'admitDate', 'status')
+    list_select_related = ('user',)
+    list_filter = ('status',)
+    search_fields = ('^user__first_name', '^user__last_name', '=user__username')
+    search_id_fields = ('id', 'user__id')
+    sortable_by = ()
+    autocomplete_fields = ('user',)
+    csv_fields = ('id', 'user__id', 'user__first_name', 'user__last_name', 'mobile', 'address', 'symptoms',
+                  'assignedDoctorId', 'admitDate', 'status')
+
+    @admin.display(description='Name')
+    def name(self, obj):
+        return obj.get_name
 admin.site.register(Patient, PatientAdmin)
 
 # Appointment
-class AppointmentAdmin(admin.ModelAdmin):
-    pass
+class AppointmentAdmin(LargeTableAdmin):
+    list_display = ('id', 'patientName', 'doctorName', 'appointmentDate', 'priority', 'status')
+    list_filter = ('status', 'priority')
+    search_fields = ('^patientName', '^doctorName')
+    search_id_fields = ('id', 'patientId', 'doctorId')
+    sortable_by = ('id', 'appointmentDate')
+    csv_fields = ('id', 'patientId', 'patientName', 'doctorId', 'doctorName', 'appointmentDate', 'priority',
+                  'status', 'description')
 admin.site.register(Appointment, AppointmentAdmin)
 
 # Patient Discharge
-class PatientDischargeDetailsAdmin(admin.ModelAdmin):
-    pass
+class PatientDischargeDetailsAdmin(LargeTableAdmin):
+    list_display = ('id', 'patientName', 'assignedDoctorName', 'admitDate', 'releaseDate', 'daySpent', 'total')
+    list_filter = (('releaseDate', admin.DateFieldListFilter),)
+    search_fields = ('^patientName', '^assignedDoctorName')
+    search_id_fields = ('id', 'patientId', 'assignedDoctorId')
+    sortable_by = ('id', 'releaseDate')
+    csv_fields = ('id', 'patientId', 'patientName', 'assignedDoctorId', 'assignedDoctorName', 'admitDate',
+                  'releaseDate', 'daySpent', 'roomCharge', 'doctorFee', 'medicineCost', 'OtherCharge', 'total')
 admin.site.register(PatientDischargeDetails, PatientDischargeDetailsAdmin)
 
+# Wards and beds
+class BedInline(admin.TabularInline):
+    model = Bed
+    extra = 0
+
+class WardAdmin(admin.ModelAdmin):
+    list_display = ('name', 'department')
+    inlines = [BedInline]
+admin.site.register(Ward, WardAdmin)
+
+class BedAssignmentAdmin(admin.ModelAdmin):
+    list_display = ('bed', 'patientId', 'episodeId', 'start', 'end')
+    list_select_related = ('bed__ward',)
+    raw_id_fields = ('bed',)
+admin.site.register(BedAssignment, BedAssignmentAdmin)
+
+# Billing
+class RoomRateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'dailyRate')
+admin.site.register(RoomRate, RoomRateAdmin)
+
+class BillLineItemAdmin(admin.ModelAdmin):
+    list_display = ('dischargeId', 'category', 'description', 'amount', 'department', 'billedOn')
+    list_filter = ('category', 'department')
+admin.site.register(BillLineItem, BillLineItemAdmin)
+
 # Feedback
 class FeedbackAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'created_at')   # shows in admin list
     search_fields = ('name', 'email', 'message')     # searchable fields
 admin.site.register(Feedback, FeedbackAdmin)
+
+# Email outbox
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+admin.site.register(EmailOutbox, EmailOutboxAdmin)
+
+# Audit log: written only by hospital.audit
+class AuditLogAdmin(LargeTableAdmin):
+    list_display = ('created_at', 'actorId', 'action', 'targetType', 'targetId', 'patientId')
+    search_fields = ('^action',)
+    search_id_fields = ('id', 'actorId', 'patientId')
+    sortable_by = ()
+    csv_fields = ('id', 'created_at', 'actorId', 'action', 'targetType', 'targetId', 'patientId', 'detail')
+
+    def get_ordering(self, request):
+        return ('-created_at', '-id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+admin.site.register(AuditLog, AuditLogAdmin)
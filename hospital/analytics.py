@@ -0,0 +1,223 @@
+"""
+Length-of-stay and cost statistics over all discharge records (live and
+archived), computed with NumPy. Columns are pulled with values_list in id
+order, chunk by chunk, so memory holds arrays rather than model instances.
+"""
+import math
+import time
+
+import numpy as np
+from django.db.models import F, OuterRef, Subquery
+
+from . import models
+
+FIELDS = ('daySpent', 'roomCharge', 'medicineCost', 'total')
+PERCENTILES = (50, 75, 90, 95, 99)
+HISTOGRAM_BINS = 20
+CHUNK_SIZE = 20000
+NO_DOCTOR = -1
+
+
+def _with_doctor(queryset):
+    department = models.Doctor.objects.filter(user_id=OuterRef('assignedDoctorId')).values('department')[:1]
+    return queryset.annotate(doctorId=F('assignedDoctorId'), department=Subquery(department))
+
+
+def load_columns(chunk_size=CHUNK_SIZE):
+    """
+    Returns {'doctorId': int array, 'department': str array, <field>: float array}.
+    """
+    chunks = {name: [] for name in ('doctorId', 'department') + FIELDS}
+    for model in (models.PatientDischargeDetails, models.ArchivedPatientDischargeDetails):
+        last_id = 0
+        while True:
+            rows = list(
+                _with_doctor(model.objects.filter(id__gt=last_id)).order_by('id')
+                .values_list('id', 'doctorId', 'department', *FIELDS)[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            columns = list(zip(*rows))
+            chunks['doctorId'].append(np.array([NO_DOCTOR if d is None else d for d in columns[1]], dtype=np.int64))
+            chunks['department'].append(np.array([d or '' for d in columns[2]], dtype=object))
+            for index, name in enumerate(FIELDS, start=3):
+                chunks[name].append(np.array(columns[index], dtype=np.float64))
+
+    empty = {'doctorId': np.int64, 'department': object}
+    return {
+        name: np.concatenate(parts) if parts else np.array([], dtype=empty.get(name, np.float64))
+        for name, parts in chunks.items()
+    }
+
+
+def summarize(values):
+    if not len(values):
+        return {'count': 0}
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'percentiles': dict(zip(map(str, PERCENTILES), np.percentile(values, PERCENTILES).tolist())),
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+    }
+
+
+def _narrow(codes, groups):
+    # NumPy's stable sort is a radix sort for 8/16-bit integers
+    if groups <= np.iinfo(np.uint8).max:
+        return codes.astype(np.uint8)
+    if groups <= np.iinfo(np.uint16).max:
+        return codes.astype(np.uint16)
+    return codes
+
+
+def grouped_percentiles(codes, values, percentiles=PERCENTILES):
+    """
+    Percentiles of values for every group, with no Python loop over groups.
+    codes are dense group numbers 0..n-1, as returned by
+    np.unique(keys, return_inverse=True). Values are sorted, then stably
+    sorted by group, and each group's slice is interpolated the same way
+    np.percentile does by default. A code with no values (codes that aren't
+    dense) gets NaN for its mean and percentiles.
+    Returns (group sizes, group means, percentile matrix), indexed by code.
+    """
+    sizes = np.bincount(codes)
+    if not len(values):
+        return sizes, np.array([]), np.empty((0, len(percentiles)))
+    order = np.argsort(values)
+    order = order[np.argsort(_narrow(codes[order], len(sizes)), kind='stable')]
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    # An empty group points at its neighbour's first value; it is blanked below
+    spans = np.maximum(sizes, 1) - 1
+    position = starts[:, None] + spans[:, None] * (np.asarray(percentiles) / 100.0)[None, :]
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    result = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+    result[sizes == 0] = np.nan
+    with np.errstate(invalid='ignore'):
+        means = np.bincount(codes, weights=values) / sizes
+    return sizes, means, result
+
+
+def _grouped(labels, codes, values):
+    sizes, means, matrix = grouped_percentiles(codes, values)
+    return [
+        {
+            'group': label,
+            'count': int(size),
+            'mean': float(mean),
+            'percentiles': dict(zip(map(str, PERCENTILES), row.tolist())),
+        }
+        for label, size, mean, row in zip(labels, sizes, means, matrix)
+    ]
+
+
+def compute_stats(columns):
+    departments, department_codes = np.unique(columns['department'], return_inverse=True)
+    doctors, doctor_codes = np.unique(columns['doctorId'], return_inverse=True)
+    return {
+        'fields': {name: summarize(columns[name]) for name in FIELDS},
+        'byDepartment': {name: _grouped(departments.tolist(), department_codes, columns[name]) for name in FIELDS},
+        'byDoctor': {name: _grouped(doctors.tolist(), doctor_codes, columns[name]) for name in FIELDS},
+    }
+
+
+def discharge_stats(chunk_size=CHUNK_SIZE):
+    return compute_stats(load_columns(chunk_size))
+
+
+# Pure-Python reference, used to check and benchmark the NumPy path
+def _percentile(sorted_values, q):
+    position = (len(sorted_values) - 1) * q / 100.0
+    low, high = math.floor(position), math.ceil(position)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def python_grouped_percentiles(keys, values, percentiles=PERCENTILES):
+    groups = {}
+    for key, value in zip(keys, values):
+        groups.setdefault(key, []).append(value)
+    result = {}
+    for key, group in groups.items():
+        group.sort()
+        result[key] = (len(group), sum(group) / len(group), [_percentile(group, q) for q in percentiles])
+    return result
+
+
+def _check_case(name, keys, values, percentiles):
+    labels, codes = np.unique(np.asarray(keys), return_inverse=True)
+    sizes, means, matrix = grouped_percentiles(codes, np.asarray(values, dtype=np.float64), percentiles)
+    got = {label: (int(size), mean, row) for label, size, mean, row in zip(labels.tolist(), sizes, means, matrix)}
+    expected = python_grouped_percentiles(list(keys), list(values), percentiles)
+    if got.keys() != expected.keys():
+        raise AssertionError(f"{name}: groups {sorted(got)} instead of {sorted(expected)}")
+    for key, (size, mean, row) in expected.items():
+        if got[key][0] != size or not np.allclose([got[key][1], *got[key][2]], [mean, *row]):
+            raise AssertionError(f"{name}: group {key!r} gives {got[key]} instead of {(size, mean, row)}")
+
+
+def check_against_python(columns, percentiles=PERCENTILES):
+    """
+    Raise AssertionError where grouped_percentiles disagrees with
+    python_grouped_percentiles: on every field of columns grouped by doctor,
+    on no rows, on a single row, and for a group without values.
+    """
+    doctors = columns['doctorId'].tolist()
+    for name in FIELDS:
+        _check_case(name, doctors, columns[name].tolist(), percentiles)
+    _check_case('no rows', [], [], percentiles)
+    _check_case('one row', [7], [3.5], percentiles)
+    # Codes 0 and 2 only: group 1 has no values
+    sizes, means, matrix = grouped_percentiles(np.array([2, 0, 2]), np.array([5.0, 1.0, 3.0]), percentiles)
+    if sizes.tolist() != [1, 0, 2] or not np.isnan(means[1]) or not np.isnan(matrix[1]).all():
+        raise AssertionError(f"empty group: sizes {sizes}, means {means}, percentiles {matrix[1]}")
+    if not np.allclose(matrix[[0, 2]], [[1.0] * len(percentiles), np.percentile([3.0, 5.0], percentiles)]):
+        raise AssertionError(f"empty group: neighbouring groups give {matrix[[0, 2]]}")
+
+
+def benchmark(columns, repeat=3):
+    """
+    Time grouped percentiles by doctor for every field, NumPy vs plain Python,
+    after checking that both give the same results (AssertionError if not).
+    """
+    check_against_python(columns)
+    as_lists = {name: columns[name].tolist() for name in ('doctorId',) + FIELDS}
+
+    def with_numpy():
+        doctors, codes = np.unique(columns['doctorId'], return_inverse=True)
+        return [grouped_percentiles(codes, columns[name]) for name in FIELDS]
+
+    def with_python():
+        return [python_grouped_percentiles(as_lists['doctorId'], as_lists[name]) for name in FIELDS]
+
+    timings = {}
+    for label, run in (('numpy', with_numpy), ('python', with_python)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+    return timings
+
+
+def synthetic_columns(rows, doctors=200, seed=0):
+    # Random data shaped like the real columns, for benchmarking at scale
+    rng = np.random.default_rng(seed)
+    days = rng.gamma(2.0, 3.0, rows).round()
+    room = days * rng.choice([500.0, 1500.0, 4000.0], rows)
+    medicine = rng.lognormal(7, 1, rows).round()
+    departments = np.array([d for d, label in models.departments], dtype=object)
+    return {
+        'doctorId': rng.integers(1, doctors + 1, rows),
+        'department': departments[rng.integers(0, len(departments), rows)],
+        'daySpent': days,
+        'roomCharge': room,
+        'medicineCost': medicine,
+        'total': room + medicine + 500,
+    }
@@ -3,3 +3,28 @@ from django.apps import AppConfig
 
 class HospitalConfig(AppConfig):
     name = 'hospital'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+        from . import authcache, models, namesync, sync
+
+        # Keep the names copied onto appointments and discharge records current
+        pre_save.connect(namesync.capture_old_name, sender=User, dispatch_uid='hospital-namesync-pre')
+        post_save.connect(namesync.schedule_name_sync, sender=User, dispatch_uid='hospital-namesync-post')
+
+        # Drop the copies of users, roles and approvals kept in sessions when they change
+        post_save.connect(authcache.user_changed, sender=User, dispatch_uid='hospital-authcache-user')
+        post_delete.connect(authcache.user_changed, sender=User, dispatch_uid='hospital-authcache-user-delete')
+        m2m_changed.connect(authcache.groups_changed, sender=User.groups.through, dispatch_uid='hospital-authcache-groups')
+        for profile in (models.Doctor, models.Patient):
+            post_save.connect(authcache.profile_changed, sender=profile, dispatch_uid=f'hospital-authcache-{profile.__name__}')
+            post_delete.connect(authcache.profile_changed, sender=profile,
+                                dispatch_uid=f'hospital-authcache-{profile.__name__}-delete')
+
+        # Log changes to patients, appointments and discharges for offline clients
+        for model in sync.SCOPES:
+            pre_save.connect(sync.capture_old_scope, sender=model, dispatch_uid=f'hospital-sync-{model.__name__}-pre')
+            post_save.connect(sync.row_saved, sender=model, dispatch_uid=f'hospital-sync-{model.__name__}')
+            post_delete.connect(sync.row_deleted, sender=model, dispatch_uid=f'hospital-sync-{model.__name__}-delete')
@@ -0,0 +1,47 @@
+
+from . import models, tenants
+
+# (live model, archive model, date field used for the cutoff, rows that may go).
+# Pending appointments stay however old they are: they are still waiting in
+# the approval queues.
+ARCHIVES = [
+    (models.Appointment, models.ArchivedAppointment, 'appointmentDate', {'status': True}),
+    (models.PatientDischargeDetails, models.ArchivedPatientDischargeDetails, 'releaseDate', {}),
+]
+
+
+def archive_before(model, archive_model, date_field, cutoff, chunk_size=500, filters=None):
+    """
+    Move rows with date_field < cutoff (and matching filters) into
+    archive_model, chunk_size rows per transaction so the write lock is only
+    held briefly. Returns rows moved.
+    """
+    # Live-only columns such as updated_at are not kept
+    archive_fields = {f.attname for f in archive_model._meta.concrete_fields}
+    field_names = [f.attname for f in model._meta.concrete_fields if f.attname in archive_fields]
+    moved = 0
+    while True:
+        with tenants.atomic():
+            rows = list(
+                model.objects.filter(**{f'{date_field}__lt': cutoff}, **(filters or {}))
+                .order_by('id').values(*field_names)[:chunk_size]
+            )
+            if not rows:
+                break
+            # ignore_conflicts makes a re-run after a crash harmless
+            archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+            model.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+    return moved
+
+
+def count_before(model, date_field, cutoff, filters=None):
+    return model.objects.filter(**{f'{date_field}__lt': cutoff}, **(filters or {})).count()
+
+
+# Read helpers: look in the live table first, then the archive
+def latest_discharge(patient_id):
+    details = models.PatientDischargeDetails.objects.filter(patientId=patient_id).order_by('-id').first()
+    if details is None:
+        details = models.ArchivedPatientDischargeDetails.objects.filter(patientId=patient_id).order_by('-id').first()
+    return details
@@ -0,0 +1,122 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from . import models, tenants, writes
+
+# Audit entries are collected per process and written with bulk_create by a
+# background thread: as soon as FLUSH_SIZE are waiting, otherwise every
+# FLUSH_SECONDS, and once more when the process exits. Requests never wait
+# on the audit table. The price is that a process that is killed outright
+# loses the entries it hasn't written yet, at most FLUSH_SECONDS worth.
+FLUSH_SIZE = 100
+FLUSH_SECONDS = 5
+# Entries kept for a later attempt while the database can't be written
+MAX_PENDING = 10000
+PAGE_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_wake = threading.Event()
+_pending = []  # (database alias, AuditLog)
+_flusher = None
+
+
+def record(actor_id, action, target, patient_id=None, **detail):
+    """
+    Log that actor_id did action to target, a model instance or a
+    (type name, id) pair. The entry is queued when the current transaction
+    commits, so an action that is rolled back leaves no trace.
+    """
+    target_type, target_id = target if isinstance(target, tuple) else (type(target).__name__, target.pk)
+    entry = models.AuditLog(
+        actorId=actor_id, action=action, targetType=target_type, targetId=target_id,
+        patientId=patient_id, detail=detail, created_at=timezone.now(),
+    )
+    alias = tenants.db()
+    tenants.on_commit(lambda: _queue(alias, entry))
+
+
+def _queue(alias, entry):
+    global _flusher
+    with _lock:
+        _pending.append((alias, entry))
+        if len(_pending) >= FLUSH_SIZE:
+            _wake.set()
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_periodically, name='audit-flush', daemon=True)
+            _flusher.start()
+
+
+def _flush_periodically():
+    while True:
+        _wake.wait(FLUSH_SECONDS)
+        _wake.clear()
+        flush()
+
+
+def flush():
+    # Write everything queued so far; returns the number of entries written
+    with _lock:
+        batch = _pending[:]
+        _pending.clear()
+    by_alias = defaultdict(list)
+    for alias, entry in batch:
+        by_alias[alias].append(entry)
+    written = 0
+    for alias, entries in by_alias.items():
+        try:
+            _write(alias, entries)
+            written += len(entries)
+        except Exception:
+            logger.exception("could not write %d audit entries to %s, will retry", len(entries), alias)
+            with _lock:
+                _pending[:0] = [(alias, entry) for entry in entries]
+                del _pending[:-MAX_PENDING]
+    return written
+
+
+def _write(alias, entries):
+    # The flusher thread has no tenant set; the lock it waits on is alias's
+    writes.call_with_retry(lambda: models.AuditLog.objects.using(alias).bulk_create(entries, batch_size=500), alias)
+
+
+def _after_fork():
+    # The child has the parent's queue but not its thread; start over
+    global _lock, _wake, _flusher
+    _lock = threading.Lock()
+    _wake = threading.Event()
+    _pending.clear()
+    _flusher = None
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def page(actor_id=None, patient_id=None, since=None, until=None, before=None, size=PAGE_SIZE):
+    """
+    Entries newest first, optionally for one actor and/or patient, within
+    [since, until). before=(created_at, id) of the last entry of the
+    previous page. Each filter combination is served by one of the
+    AuditLog indexes.
+    """
+    entries = models.AuditLog.objects.all()
+    if actor_id is not None:
+        entries = entries.filter(actorId=actor_id)
+    if patient_id is not None:
+        entries = entries.filter(patientId=patient_id)
+    if since is not None:
+        entries = entries.filter(created_at__gte=since)
+    if until is not None:
+        entries = entries.filter(created_at__lt=until)
+    if before is not None:
+        created_at, last_id = before
+        entries = entries.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id))
+    return entries.order_by('-created_at', '-id')[:size]
@@ -0,0 +1,152 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.crypto import get_random_string
+
+from . import models, tenants
+
+# With settings.AUTH_CACHE on, the logged-in user, their groups and whether
+# their doctor/patient account is approved are copied into the session, so a
+# request checks login and role without reading auth_user or auth_user_groups.
+# Each user has a version token in the cache. Changing the user, their groups
+# or their approval drops the token; sessions copied under the old one load
+# from the database again on their next request. Worker processes only see
+# each other's changes through a shared cache (settings.CACHES); the copy is
+# reloaded every MAX_AGE seconds regardless.
+SESSION_KEY = '_hms_user'
+FIELDS = ('id', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff', 'is_active')
+MAX_AGE = 300
+
+
+def _version_key(user_id):
+    return f'hms-auth:{tenants.db()}:{user_id}'
+
+
+def _new_version():
+    return get_random_string(12)
+
+
+def _session_user_id(session_value):
+    return User._meta.pk.to_python(session_value)
+
+
+def _approved(user):
+    # Approval of the doctor or patient account; None for other users
+    for profile in (models.Doctor, models.Patient):
+        status = profile.objects.filter(user_id=user.id).values_list('status', flat=True).first()
+        if status is not None:
+            return status
+    return None
+
+
+def _snapshot(user, version):
+    return {
+        'v': version,
+        'at': time.time(),
+        'user': {name: getattr(user, name) for name in FIELDS},
+        'roles': sorted(user.groups.values_list('name', flat=True)),
+        'approved': _approved(user),
+    }
+
+
+def _is_current(data, user_id, version):
+    return (data is not None and data['v'] == version and data['user']['id'] == user_id
+            and time.time() - data['at'] < MAX_AGE)
+
+
+def _attach(user, data):
+    user.hms_roles = frozenset(data['roles'])
+    user.hms_approved = data['approved']
+    return user
+
+
+def _restore(data):
+    # The fields not copied (password, last_login, date_joined) are deferred
+    # and load on access, and save() leaves them alone
+    user = User.from_db(tenants.db(), FIELDS, [data['user'][name] for name in FIELDS])
+    return _attach(user, data)
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = _get_user(request)
+    return request._cached_user
+
+
+def _get_user(request):
+    if not settings.AUTH_CACHE or auth.SESSION_KEY not in request.session:
+        return auth.get_user(request)
+    user_id = _session_user_id(request.session[auth.SESSION_KEY])
+    key = _version_key(user_id)
+    cache.add(key, _new_version(), None)
+    version = cache.get(key)
+    data = request.session.get(SESSION_KEY)
+    if _is_current(data, user_id, version):
+        return _restore(data)
+    # Read the version first: if the user changes while we load, the copy is
+    # stored under a token that is already gone
+    user = auth.get_user(request)
+    if user.is_authenticated and version is not None:
+        data = _snapshot(user, version)
+        request.session[SESSION_KEY] = data
+        _attach(user, data)
+    return user
+
+
+async def auser(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await _aget_user(request)
+    return request._acached_user
+
+
+async def _aget_user(request):
+    if not settings.AUTH_CACHE or not await request.session.ahas_key(auth.SESSION_KEY):
+        return await auth.aget_user(request)
+    user_id = _session_user_id(await request.session.aget(auth.SESSION_KEY))
+    key = _version_key(user_id)
+    await cache.aadd(key, _new_version(), None)
+    version = await cache.aget(key)
+    data = await request.session.aget(SESSION_KEY)
+    if _is_current(data, user_id, version):
+        return _restore(data)
+    user = await auth.aget_user(request)
+    if user.is_authenticated and version is not None:
+        data = await sync_to_async(_snapshot)(user, version)
+        await request.session.aset(SESSION_KEY, data)
+        _attach(user, data)
+    return user
+
+
+def invalidate(user_id):
+    # After commit, or a request in between could copy the old state under a fresh token
+    key = _version_key(user_id)
+    tenants.on_commit(lambda: cache.delete(key))
+
+
+# Signal handlers, connected in HospitalConfig.ready()
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Logging in saves last_login, which the copy doesn't hold
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate(instance.pk)
+
+
+def profile_changed(sender, instance, **kwargs):
+    invalidate(instance.user_id)
+
+
+def groups_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, User):
+        user_ids = [instance.pk]
+    elif action == 'pre_clear':
+        user_ids = list(instance.user_set.values_list('id', flat=True))
+    else:
+        user_ids = pk_set
+    for user_id in user_ids:
+        invalidate(user_id)
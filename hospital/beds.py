@@ -0,0 +1,108 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.db.models import Count, Exists, F, OuterRef
+
+from . import models, tenants
+
+# An assignment occupies its bed on the days [start, end): the bed is free
+# again on the discharge day.
+
+
+def _taken():
+    return models.BedAssignment.objects.filter(bed=OuterRef('pk'), end__isnull=True)
+
+
+def free_beds(ward_id):
+    return models.Bed.objects.filter(ward_id=ward_id, active=True).exclude(Exists(_taken())).order_by('label')
+
+
+def wards_with_free_beds():
+    # Each ward annotated with its number of free beds right now
+    free = (models.Bed.objects.filter(ward=OuterRef('pk'), active=True).exclude(Exists(_taken()))
+            .values('ward').annotate(n=Count('id')).values('n'))
+    return models.Ward.objects.annotate(free=free).order_by('name')
+
+
+def assign(episode, ward_id, day):
+    """
+    Put the patient of episode in a free bed of ward_id from day on. Returns
+    the BedAssignment, or None when the ward is full.
+    """
+    for bed in free_beds(ward_id)[:10]:
+        try:
+            with tenants.atomic():
+                return models.BedAssignment.objects.create(
+                    bed=bed, wardId=ward_id, episodeId=episode.id, patientId=episode.patientId, start=day,
+                )
+        except IntegrityError:
+            # one_open_assignment_per_bed: someone else took this bed, try the next
+            continue
+    return None
+
+
+def release(episode, day):
+    # Free the episode's bed and move its stay into the per-day counters
+    for assignment in models.BedAssignment.objects.filter(episodeId=episode.id, end__isnull=True):
+        if models.BedAssignment.objects.filter(id=assignment.id, end__isnull=True).update(end=day):
+            _add_occupancy(assignment.wardId, assignment.start, day)
+
+
+def _add_occupancy(ward_id, start, end):
+    days = [start + timedelta(days=i) for i in range((end - start).days)]
+    if not days:
+        return
+    models.WardOccupancy.objects.bulk_create(
+        [models.WardOccupancy(wardId=ward_id, day=day) for day in days], ignore_conflicts=True,
+    )
+    models.WardOccupancy.objects.filter(wardId=ward_id, day__gte=start, day__lt=end).update(occupied=F('occupied') + 1)
+
+
+def availability(ward_id, start, end):
+    """
+    Beds free in ward_id on each day of [start, end], from the per-day
+    counters plus the ward's open assignments (at most one per bed).
+    Capacity is the ward's current number of active beds.
+    """
+    capacity = models.Bed.objects.filter(ward_id=ward_id, active=True).count()
+    closed = dict(models.WardOccupancy.objects.filter(wardId=ward_id, day__range=(start, end))
+                  .values_list('day', 'occupied'))
+    open_starts = sorted(models.BedAssignment.objects.filter(wardId=ward_id, end__isnull=True)
+                         .values_list('start', flat=True))
+    days = []
+    day = start
+    while day <= end:
+        occupied = closed.get(day, 0) + bisect_right(open_starts, day)
+        days.append({'day': day, 'occupied': occupied, 'free': max(capacity - occupied, 0)})
+        day += timedelta(days=1)
+    return {
+        'capacity': capacity,
+        'minFree': min((d['free'] for d in days), default=capacity),
+        'days': days,
+    }
+
+
+def rebuild_occupancy():
+    """
+    Recompute WardOccupancy from the finished assignments. Returns rows written.
+    """
+    changes = defaultdict(lambda: defaultdict(int))
+    closed = models.BedAssignment.objects.filter(end__isnull=False).values_list('wardId', 'start', 'end')
+    for ward_id, start, end in closed.iterator():
+        if end > start:
+            changes[ward_id][start] += 1
+            changes[ward_id][end] -= 1
+    rows = []
+    for ward_id, ward_changes in changes.items():
+        occupied = 0
+        marks = sorted(ward_changes)
+        for day, next_day in zip(marks, marks[1:]):
+            occupied += ward_changes[day]
+            rows += [models.WardOccupancy(wardId=ward_id, day=day + timedelta(days=i), occupied=occupied)
+                     for i in range((next_day - day).days) if occupied]
+    with tenants.atomic():
+        models.WardOccupancy.objects.all().delete()
+        models.WardOccupancy.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,89 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.contrib.auth.models import User
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+from . import models
+
+CENT = Decimal('0.01')
+
+
+def parse_amount(value):
+    # Raises ValueError for anything that isn't a non-negative amount
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(f"Invalid amount: {value!r}")
+    return amount.quantize(CENT)
+
+
+def whole_units(amount):
+    # For the legacy integer columns on PatientDischargeDetails
+    return int(amount.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def build_line_items(days, daily_room_rate, doctor_fee, medicine_cost, other_charge, room_name='Room'):
+    items = [
+        models.BillLineItem(category='room', description=f"{room_name} ({days} days)", quantity=days, unitPrice=daily_room_rate),
+        models.BillLineItem(category='doctor', description='Doctor fee', unitPrice=doctor_fee),
+        models.BillLineItem(category='medicine', description='Medicines', unitPrice=medicine_cost),
+        models.BillLineItem(category='other', description='Other charges', unitPrice=other_charge),
+    ]
+    for item in items:
+        item.amount = (Decimal(item.quantity) * item.unitPrice).quantize(CENT)
+    return items
+
+
+def category_totals(items):
+    totals = {category: Decimal('0.00') for category, label in models.charge_categories}
+    for item in items:
+        totals[item.category] += item.amount
+    return totals
+
+
+def save_line_items(discharge, items, doctorId=None, department=''):
+    for item in items:
+        item.dischargeId = discharge.id
+        item.patientId = discharge.patientId
+        item.doctorId = doctorId
+        item.department = department or ''
+        item.billedOn = discharge.releaseDate
+    models.BillLineItem.objects.bulk_create(items)
+
+
+# Revenue reports. Each one is a single GROUP BY query.
+def billed_items(start=None, end=None):
+    items = models.BillLineItem.objects.all()
+    if start:
+        items = items.filter(billedOn__gte=start)
+    if end:
+        items = items.filter(billedOn__lte=end)
+    return items
+
+
+def revenue_by_department(start=None, end=None):
+    return (billed_items(start, end).values('department')
+            .annotate(revenue=Sum('amount'), items=Count('id'))
+            .order_by('-revenue'))
+
+
+def revenue_by_doctor(start=None, end=None):
+    doctor_name = User.objects.filter(id=OuterRef('doctorId')).values('first_name')[:1]
+    return (billed_items(start, end).values('doctorId')
+            .annotate(revenue=Sum('amount'), items=Count('id'), doctorName=Subquery(doctor_name))
+            .order_by('-revenue'))
+
+
+def revenue_by_day(start=None, end=None):
+    return (billed_items(start, end).values('billedOn')
+            .annotate(revenue=Sum('amount'), items=Count('id'))
+            .order_by('billedOn'))
+
+
+REVENUE_REPORTS = {
+    'department': revenue_by_department,
+    'doctor': revenue_by_doctor,
+    'day': revenue_by_day,
+}
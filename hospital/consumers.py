@@ -0,0 +1,37 @@
+# Handlers for the domain events in hospital/events.py, run by `manage.py run_consumers`.
+from . import models, outbox, rollups
+from .events import (
+    AppointmentApproved, AppointmentBooked, DoctorApproved, PatientAdmitted, PatientDischarged, consumer,
+)
+
+
+@consumer('rollups', PatientAdmitted, PatientDischarged)
+def update_rollups(events):
+    for event in events:
+        if isinstance(event, PatientAdmitted):
+            rollups.record_admission(event.admittedAt)
+        else:
+            rollups.record_discharge(event.releaseDate, event.daySpent, event.total, event.department)
+
+
+def _emails(user_ids):
+    return dict(models.User.objects.filter(id__in=user_ids).exclude(email='').values_list('id', 'email'))
+
+
+@consumer('notifications', DoctorApproved, AppointmentBooked, AppointmentApproved)
+def send_notifications(events):
+    # One user lookup for the whole batch; users without an email address are skipped
+    emails = _emails({user_id for event in events
+                      for user_id in (getattr(event, 'doctorUserId', None), getattr(event, 'patientUserId', None))
+                      if user_id})
+    for event in events:
+        if isinstance(event, DoctorApproved):
+            to, subject, body = event.doctorUserId, "Your account is approved", "You can now log in as a doctor."
+        elif isinstance(event, AppointmentBooked):
+            to, subject = event.doctorUserId, "New appointment request"
+            body = f"Appointment request #{event.appointmentId} is waiting for approval."
+        else:
+            to, subject = event.patientUserId, "Your appointment is approved"
+            body = f"Appointment #{event.appointmentId} has been approved."
+        if to in emails:
+            outbox.queue_message(subject, body, [emails[to]])
@@ -0,0 +1,9 @@
+from django.urls import get_script_prefix
+
+from . import tenants
+
+
+def fragments(request):
+    # Goes into every fragment cache key: cached HTML holds links, which
+    # differ per hospital and path prefix
+    return {'fragment_scope': f'{tenants.db()}:{get_script_prefix()}'}
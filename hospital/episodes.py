@@ -0,0 +1,62 @@
+from datetime import date
+
+from django.db import IntegrityError
+from django.db.models import Q
+
+from . import events, models, tenants
+
+
+def current(patient_id):
+    # The open stay, if the patient is in hospital
+    return models.AdmissionEpisode.objects.filter(patientId=patient_id, discharged_at__isnull=True).first()
+
+
+def history(patient_id):
+    # Most recent stay first
+    return models.AdmissionEpisode.objects.filter(patientId=patient_id).order_by('-admitted_at', '-id')
+
+
+def admit(patient, day=None):
+    """
+    Open a stay for patient starting on day (today by default) and return it.
+    Returns None when the patient already has an open stay.
+    """
+    day = day or date.today()
+    try:
+        with tenants.atomic():
+            episode = models.AdmissionEpisode.objects.create(
+                patientId=patient.id, doctorId=patient.assignedDoctorId, admitted_at=day,
+            )
+            events.publish(events.PatientAdmitted(patientId=patient.id, episodeId=episode.id, admittedAt=day))
+    except IntegrityError:
+        # one_open_episode: already admitted
+        return None
+    models.Patient.objects.filter(id=patient.id).update(admitDate=day)
+    patient.admitDate = day
+    return episode
+
+
+def close(episode, day):
+    """
+    Mark episode discharged on day. Returns False if it was closed already,
+    e.g. by a second submit of the discharge form.
+    """
+    closed = models.AdmissionEpisode.objects.filter(id=episode.id, discharged_at__isnull=True).update(discharged_at=day)
+    episode.discharged_at = day
+    return bool(closed)
+
+
+# Date queries, served by the (discharged_at, admitted_at) index
+def currently_admitted():
+    return models.AdmissionEpisode.objects.filter(discharged_at__isnull=True)
+
+
+def overlapping(start, end):
+    # Stays that were open at any point in [start, end]
+    return models.AdmissionEpisode.objects.filter(
+        Q(discharged_at__gte=start, admitted_at__lte=end) | Q(discharged_at__isnull=True, admitted_at__lte=end)
+    )
+
+
+def in_hospital_on(day):
+    return overlapping(day, day)
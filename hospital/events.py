@@ -0,0 +1,140 @@
+import dataclasses
+import typing
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from . import models, tenants
+
+# Event types, by DomainEvent.type
+EVENT_TYPES = {}
+
+
+def event_type(cls):
+    cls = dataclasses.dataclass(frozen=True)(cls)
+    EVENT_TYPES[cls.__name__] = cls
+    return cls
+
+
+class Event:
+    id = None  # DomainEvent id, set on events read back from the table
+
+    @classmethod
+    def from_row(cls, row):
+        # The payload is JSON; turn dates and decimals back into their field types
+        hints = typing.get_type_hints(cls)
+        values = {}
+        for field in dataclasses.fields(cls):
+            value = row.payload.get(field.name)
+            if value is not None and hints[field.name] in (date, Decimal):
+                value = date.fromisoformat(value) if hints[field.name] is date else Decimal(value)
+            values[field.name] = value
+        event = cls(**values)
+        object.__setattr__(event, 'id', row.id)
+        return event
+
+
+@event_type
+class DoctorApproved(Event):
+    doctorUserId: int
+
+
+@event_type
+class PatientAdmitted(Event):
+    patientId: int
+    episodeId: int
+    admittedAt: date
+
+
+@event_type
+class AppointmentBooked(Event):
+    appointmentId: int
+    patientUserId: int
+    doctorUserId: int
+    priority: int
+
+
+@event_type
+class AppointmentApproved(Event):
+    appointmentId: int
+    patientUserId: int
+    doctorUserId: int
+
+
+@event_type
+class AppointmentDeleted(Event):
+    # Rejected by an admin or removed by the doctor
+    appointmentId: int
+    patientUserId: int
+    doctorUserId: int
+
+
+@event_type
+class PatientDischarged(Event):
+    dischargeId: int
+    patientId: int
+    doctorUserId: int
+    department: str
+    releaseDate: date
+    daySpent: int
+    total: Decimal
+
+
+def publish(event):
+    # Written in the caller's transaction: the event exists exactly when the change it describes does
+    return models.DomainEvent.objects.create(type=type(event).__name__, payload=dataclasses.asdict(event))
+
+
+SETTLE_SECONDS = 2
+
+# Consumers: name -> (handler, event classes). A handler gets a list of events
+# in id order and must not assume it sees each one only once.
+CONSUMERS = {}
+
+
+def consumer(name, *types):
+    def register(handler):
+        CONSUMERS[name] = (handler, types)
+        return handler
+    return register
+
+
+def run_consumer(name, batch_size=100):
+    """
+    Hand the next batch_size unseen events to consumer name. The handler's
+    database writes and the checkpoint move commit together; if the handler
+    raises, nothing is committed and the batch is delivered again next run.
+    Returns the number of events handled.
+    """
+    handler, types = CONSUMERS[name]
+    with tenants.atomic():
+        checkpoint, _ = models.ConsumerCheckpoint.objects.get_or_create(consumer=name)
+        # Locked so two runners don't hand the same batch to one consumer
+        checkpoint = models.ConsumerCheckpoint.objects.select_for_update().get(id=checkpoint.id)
+        rows = list(models.DomainEvent.objects.filter(
+            id__gt=checkpoint.lastEventId, type__in=[cls.__name__ for cls in types],
+            # An id handed out by a transaction that hasn't committed yet would be
+            # skipped for good once a later id is checkpointed; give writers time to commit
+            created_at__lte=timezone.now() - timedelta(seconds=SETTLE_SECONDS),
+        ).order_by('id')[:batch_size])
+        if not rows:
+            return 0
+        handler([EVENT_TYPES[row.type].from_row(row) for row in rows])
+        checkpoint.lastEventId = rows[-1].id
+        checkpoint.save(update_fields=['lastEventId', 'updated_at'])
+    return len(rows)
+
+
+def run_all(batch_size=100):
+    # One batch for every registered consumer; returns {name: events handled}
+    from . import consumers  # noqa: F401 registers the handlers
+    return {name: run_consumer(name, batch_size) for name in CONSUMERS}
+
+
+def prune(before):
+    # Delete events older than before that every consumer has already handled
+    from . import consumers  # noqa: F401
+    done = min((models.ConsumerCheckpoint.objects.filter(consumer=name).values_list('lastEventId', flat=True).first() or 0)
+               for name in CONSUMERS)
+    return models.DomainEvent.objects.filter(id__lte=done, created_at__lt=before).delete()[0]
@@ -1,6 +1,6 @@
 from django import forms
 from django.contrib.auth.models import User
-from . import models
+from . import beds, models
 
 
 
@@ -47,6 +47,15 @@ class PatientForm(forms.ModelForm):
         fields=['address','mobile','status','symptoms','profile_pic']
 
 
+class WardChoiceField(forms.ModelChoiceField):
+    def label_from_instance(self, ward):
+        return "{} ({} free)".format(ward.name, ward.free or 0)
+
+
+#ward to take a bed in, when admitting a patient
+class AdmissionWardForm(forms.Form):
+    wardId=WardChoiceField(queryset=beds.wards_with_free_beds(),required=False,empty_label="Ward (no bed)")
+
 
 class AppointmentForm(forms.ModelForm):
     doctorId=forms.ModelChoiceField(queryset=models.Doctor.objects.all().filter(status=True),empty_label="Doctor Name and Department", to_field_name="user_id")
@@ -60,7 +69,7 @@ class PatientAppointmentForm(forms.ModelForm):
     doctorId=forms.ModelChoiceField(queryset=models.Doctor.objects.all().filter(status=True),empty_label="Doctor Name and Department", to_field_name="user_id")
     class Meta:
         model=models.Appointment
-        fields=['description','status']
+        fields=['description','status','priority']
 
 
 #for contact us page
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import logging
+from datetime import timedelta
+
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import events, models
+
+# Live appointment updates for the doctors' appointment page, sent as
+# server-sent events. Each process runs one poller task that reads new
+# appointment events from DomainEvent for every database with doctors
+# listening, and hands each one to the doctor it concerns. The database sees
+# one small query per POLL_SECONDS however many doctors are connected; an idle
+# connection costs a queue and a sleeping coroutine. Needs the ASGI app.
+POLL_SECONDS = 1
+KEEPALIVE_SECONDS = 20
+RECONNECT_SECONDS = 5
+# Events a reconnecting page is sent; further behind, it reloads instead
+CATCH_UP = 100
+QUEUE_SIZE = 100
+# DomainEvent.type -> SSE event name
+TYPES = {'AppointmentBooked': 'booked', 'AppointmentApproved': 'approved', 'AppointmentDeleted': 'deleted'}
+
+logger = logging.getLogger(__name__)
+
+_listeners = {}  # (database alias, doctor user id) -> set of asyncio.Queue
+_positions = {}  # database alias -> last DomainEvent id handed out
+_poller = None
+
+
+def _settled(alias):
+    # As for the consumers: an id can be handed out before an earlier one commits
+    return models.DomainEvent.objects.using(alias).filter(
+        type__in=TYPES, created_at__lte=timezone.now() - timedelta(seconds=events.SETTLE_SECONDS))
+
+
+async def latest_event_id(alias):
+    # Where a page rendered now starts listening
+    return (await _settled(alias).aaggregate(last=Max('id')))['last'] or 0
+
+
+async def _messages(alias, rows):
+    """
+    (doctor user id, message) for each DomainEvent row. Approved appointments
+    come with their table row rendered, so the page can insert it as is.
+    """
+    appointment_ids = [row.payload['appointmentId'] for row in rows if row.type != 'AppointmentDeleted']
+    appointments = {a.id: a async for a in models.Appointment.objects.using(alias).filter(id__in=appointment_ids)}
+    patient_ids = [a.patientId for a in appointments.values()]
+    patients = {p.user_id: p async for p in models.Patient.objects.using(alias).filter(user_id__in=patient_ids)}
+    messages = []
+    for row in rows:
+        name, data = TYPES[row.type], {'id': row.payload['appointmentId']}
+        if name != 'deleted':
+            appointment = appointments.get(data['id'])
+            if appointment is None:
+                continue  # deleted since; that event follows
+            if name == 'booked':
+                data.update(patientName=appointment.patientName, description=appointment.description)
+            else:
+                data['html'] = render_to_string('hospital/doctor_appointment_row.html', {
+                    'a': appointment, 'p': patients.get(appointment.patientId),
+                })
+        messages.append((row.payload['doctorUserId'], {'id': row.id, 'event': name, 'data': data}))
+    return messages
+
+
+def _offer(queue, message):
+    if queue.full():
+        # The page isn't keeping up; have it reload instead of queueing more
+        while not queue.empty():
+            queue.get_nowait()
+        message = {'id': message['id'], 'event': 'reload', 'data': {}}
+    queue.put_nowait(message)
+
+
+async def _deliver(alias):
+    if alias not in _positions:
+        return
+    rows = [row async for row in _settled(alias).filter(id__gt=_positions[alias]).order_by('id')[:500]]
+    if not rows or alias not in _positions:  # the last listener may have left meanwhile
+        return
+    _positions[alias] = rows[-1].id
+    wanted = [row for row in rows if (alias, row.payload.get('doctorUserId')) in _listeners]
+    for doctor_id, message in await _messages(alias, wanted):
+        for queue in _listeners.get((alias, doctor_id), ()):
+            _offer(queue, message)
+
+
+async def _poll():
+    global _poller
+    try:
+        while _listeners:
+            await asyncio.sleep(POLL_SECONDS)
+            for alias in {alias for alias, _ in _listeners}:
+                try:
+                    await _deliver(alias)
+                except Exception:
+                    logger.exception("could not read appointment events from %s", alias)
+    finally:
+        _poller = None
+
+
+def _ensure_poller():
+    global _poller
+    loop = asyncio.get_running_loop()
+    if _poller is None or _poller.done() or _poller.get_loop() is not loop:
+        _poller = loop.create_task(_poll())
+
+
+async def _catch_up(alias, doctor_id, after, until):
+    rows = [row async for row in _settled(alias).filter(
+        id__gt=after, id__lte=until, payload__doctorUserId=doctor_id,
+    ).order_by('id')[:CATCH_UP + 1]]
+    if len(rows) > CATCH_UP:
+        return [{'id': until, 'event': 'reload', 'data': {}}]
+    return [message for _, message in await _messages(alias, rows)]
+
+
+def _format(message):
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+async def stream(alias, doctor_id, after=None):
+    """
+    The SSE stream for doctor_id: events after DomainEvent id after (the page's
+    starting point or the browser's Last-Event-ID), then new ones as they come.
+    """
+    key = (alias, doctor_id)
+    queue = asyncio.Queue(QUEUE_SIZE)
+    _listeners.setdefault(key, set()).add(queue)
+    try:
+        if alias not in _positions:
+            last = await latest_event_id(alias)
+            _positions.setdefault(alias, last)
+        # Everything after this position reaches the queue
+        position = _positions[alias]
+        _ensure_poller()
+        yield f"retry: {RECONNECT_SECONDS * 1000}\n\n"
+        if after is not None and after < position:
+            for message in await _catch_up(alias, doctor_id, after, position):
+                yield _format(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if after is None or message['id'] > after:
+                yield _format(message)
+    finally:
+        _listeners[key].discard(queue)
+        if not _listeners[key]:
+            del _listeners[key]
+        if not any(a == alias for a, _ in _listeners):
+            # Start from the then latest event when someone listens again
+            _positions.pop(alias, None)
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hospital import archive
+
+
+class Command(BaseCommand):
+    help = ('Move decided appointments and discharge records older than a cutoff '
+            'into the archive tables, in small transactions. Pending appointments stay.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='cutoff date (YYYY-MM-DD); rows dated before it are archived')
+        parser.add_argument('--days', type=int, default=365, help='archive rows older than this many days (default 365)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='only report how many rows would move')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date like 2024-01-31')
+        else:
+            cutoff = date.today() - timedelta(days=options['days'])
+
+        for model, archive_model, date_field, filters in archive.ARCHIVES:
+            name = model.__name__
+            if options['dry_run']:
+                count = archive.count_before(model, date_field, cutoff, filters)
+                self.stdout.write(f"{name}: {count} rows before {cutoff} would be archived")
+            else:
+                moved = archive.archive_before(model, archive_model, date_field, cutoff, options['chunk_size'], filters)
+                self.stdout.write(f"{name}: archived {moved} rows before {cutoff}")
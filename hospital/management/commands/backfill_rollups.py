@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from hospital import rollups
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the admission and revenue rollup tables from the patient, discharge '
+            '(live and archived) and billing tables.')
+
+    def handle(self, *args, **options):
+        admission_rows, revenue_rows = rollups.backfill()
+        self.stdout.write(f"wrote {admission_rows} admission rollup rows and {revenue_rows} revenue rollup rows")
@@ -0,0 +1,81 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = ('Fire concurrent GETs at one page through the WSGI (sync) handler and the '
+            'ASGI (async) handler in-process and compare throughput and latency.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='user to log in as (must be allowed to see --path)')
+        parser.add_argument('--path', default='/admin-view-doctor/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError("No user named '%s'" % options['username'])
+
+        # The test clients send Host: testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            # Log in once and share the session cookie with every client
+            login_client = Client()
+            login_client.force_login(user)
+            self.cookies = login_client.cookies
+            self.path = options['path']
+
+            for name, runner in (('WSGI', self.run_wsgi), ('ASGI', self.run_asgi)):
+                elapsed, latencies, statuses = runner(options['requests'], options['concurrency'])
+                self.report(name, elapsed, latencies, statuses)
+
+    def run_wsgi(self, total, concurrency):
+        def fetch(_):
+            client = Client()
+            client.cookies = self.cookies
+            start = time.perf_counter()
+            response = client.get(self.path)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, range(total)))
+        return time.perf_counter() - start, [r[0] for r in results], [r[1] for r in results]
+
+    def run_asgi(self, total, concurrency):
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch():
+                async with semaphore:
+                    client = AsyncClient()
+                    client.cookies = self.cookies
+                    start = time.perf_counter()
+                    response = await client.get(self.path)
+                    return time.perf_counter() - start, response.status_code
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(fetch() for _ in range(total)))
+            return time.perf_counter() - start, [r[0] for r in results], [r[1] for r in results]
+
+        return asyncio.run(main())
+
+    def report(self, name, elapsed, latencies, statuses):
+        latencies = sorted(latencies)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        codes = {code: statuses.count(code) for code in set(statuses)}
+        self.stdout.write(
+            '%s: %d requests in %.2fs -> %.1f req/s, p50 %.1fms, p95 %.1fms, status %s' % (
+                name, len(latencies), elapsed, len(latencies) / elapsed,
+                statistics.median(latencies) * 1000, p95 * 1000, codes,
+            )
+        )
@@ -0,0 +1,39 @@
+import re
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from hospital import tenants
+
+
+class Command(BaseCommand):
+    help = ('Create the database of a hospital (tenant), tenants/<slug>.sqlite3, or bring an '
+            'existing one up to date, by running all migrations on it. Running servers pick up '
+            'a new tenant when they are restarted.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help='lowercase letters, digits and dashes; used as subdomain and /t/<slug>/ prefix')
+
+    def handle(self, *args, **options):
+        slug = options['slug']
+        if not re.fullmatch(r'[a-z0-9][a-z0-9-]{0,39}', slug):
+            raise CommandError('slug must be lowercase letters, digits and dashes')
+        alias = tenants.alias_for(slug)
+        if alias not in settings.DATABASES:
+            settings.TENANT_DIR.mkdir(exist_ok=True)
+            settings.DATABASES[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': settings.TENANT_DIR / f'{slug}.sqlite3',
+                'OPTIONS': settings.SQLITE_OPTIONS,
+            }
+            # Fill in the defaults Django adds to configured databases
+            connections.configure_settings(settings.DATABASES)
+            created = True
+        else:
+            created = False
+        call_command('migrate', database=alias, interactive=False, verbosity=options['verbosity'])
+        self.stdout.write(f"{'created' if created else 'migrated'} tenant {slug} ({settings.DATABASES[alias]['NAME']})")
+        if created:
+            self.stdout.write(f"add an admin with: python manage.py createsuperuser --database {alias}")
@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Percentiles, histograms and per-department / per-doctor distributions of '
+            'length of stay and charges over all discharge records.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=20000)
+        parser.add_argument('--benchmark', action='store_true',
+                            help='check the NumPy grouped percentiles against a pure-Python loop and time both')
+        parser.add_argument('--synthetic', type=int, metavar='ROWS',
+                            help='benchmark on ROWS rows of random data instead of the database')
+
+    def handle(self, *args, **options):
+        # Imported here so numpy is only needed when the command runs
+        from hospital import analytics
+
+        if options['synthetic']:
+            columns = analytics.synthetic_columns(options['synthetic'])
+        else:
+            columns = analytics.load_columns(options['chunk_size'])
+
+        if options['benchmark'] or options['synthetic']:
+            try:
+                timings = analytics.benchmark(columns)
+            except AssertionError as error:
+                raise CommandError(f'NumPy and pure-Python results differ: {error}')
+            self.stdout.write(
+                'rows: %d  numpy: %.1fms  python: %.1fms  speedup: %.1fx' % (
+                    len(columns['total']), timings['numpy'] * 1000, timings['python'] * 1000,
+                    timings['python'] / timings['numpy'] if timings['numpy'] else float('inf'),
+                )
+            )
+            return
+
+        self.stdout.write(json.dumps(analytics.compute_stats(columns), indent=2))
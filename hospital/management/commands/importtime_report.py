@@ -0,0 +1,115 @@
+import ast
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before serving its first request
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver, resolve
+get_resolver().url_patterns
+resolve('/')
+print(f'{(time.perf_counter() - start) * 1000:.1f}')
+"""
+
+# Heavy packages that only specific views need and must load lazily
+DEFAULT_FORBIDDEN = 'xhtml2pdf,reportlab,html5lib,numpy'
+
+
+def lazy_imports():
+    """
+    (file, line, import) for every import inside a function in the hospital
+    package. These only run when their view is hit, so a broken one would
+    otherwise go unnoticed until then.
+    """
+    root = Path(settings.BASE_DIR) / 'hospital'
+    for path in sorted(root.rglob('*.py')):
+        if 'migrations' in path.parts:
+            continue
+        package = '.'.join(path.relative_to(settings.BASE_DIR).with_suffix('').parts)
+        if path.name != '__init__.py':
+            package = package.rpartition('.')[0]
+        tree = ast.parse(path.read_text(), str(path))
+        for function in ast.walk(tree):
+            if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for node in ast.walk(function):
+                if isinstance(node, ast.ImportFrom):
+                    module = importlib.util.resolve_name('.' * node.level + (node.module or ''), package)
+                    for alias in node.names:
+                        yield path, node.lineno, module, alias.name
+                elif isinstance(node, ast.Import):
+                    for alias in node.names:
+                        yield path, node.lineno, alias.name, None
+
+
+def unresolved(module, name):
+    # The error importing module (and name from it), or None
+    try:
+        imported = importlib.import_module(module)
+        if name is not None and not hasattr(imported, name):
+            importlib.import_module(f'{module}.{name}')
+    except ImportError as error:
+        return str(error)
+    return None
+
+
+class Command(BaseCommand):
+    help = ('Run django.setup() plus URL resolution in a fresh interpreter under '
+            '`python -X importtime` and report the slowest imports. With --max-ms or '
+            '--forbid it exits non-zero on a regression, so it can gate CI. Also '
+            'checks that the imports done lazily inside functions resolve.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='number of imports to list')
+        parser.add_argument('--max-ms', type=float, help='fail if startup takes longer than this')
+        parser.add_argument('--forbid', default=DEFAULT_FORBIDDEN,
+                            help='comma separated top-level packages that must not be imported at startup')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'hospitalmanagement.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=env,
+        )
+        if result.returncode:
+            raise CommandError('startup failed:\n' + result.stderr[-2000:])
+
+        imports = []
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith('import time:') or 'imported package' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            imports.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+        startup_ms = float(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(f"startup (django.setup + URL resolution): {startup_ms:.1f}ms, {len(imports)} modules imported")
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for cumulative_us, self_us, name in sorted(imports, reverse=True)[:options['limit']]:
+            self.stdout.write(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+        problems = []
+        loaded = {name.strip().split('.')[0] for _, _, name in imports}
+        forbidden = [pkg for pkg in options['forbid'].split(',') if pkg]
+        for pkg in forbidden:
+            if pkg in loaded:
+                problems.append(f"{pkg} is imported at startup")
+        if options['max_ms'] is not None and startup_ms > options['max_ms']:
+            problems.append(f"startup took {startup_ms:.1f}ms, over the {options['max_ms']:.1f}ms budget")
+        # Imported here, after the startup measurement ran in its own interpreter
+        for path, line, module, name in lazy_imports():
+            error = unresolved(module, name)
+            if error:
+                problems.append(f"{path.relative_to(settings.BASE_DIR)}:{line}: lazy import fails: {error}")
+        if problems:
+            raise CommandError('; '.join(problems))
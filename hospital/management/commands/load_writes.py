@@ -0,0 +1,251 @@
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+
+# Statements that need SQLite's write lock; the time spent in them under
+# load is mostly time spent waiting for that lock.
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'BEGIN', 'COMMIT', 'RELEASE', 'SAVEPOINT')
+
+DEFAULT_CONFIGS = [
+    'journal=delete,timeout=0.05,mode=deferred',
+    'journal=delete,timeout=5,mode=deferred',
+    'journal=wal,timeout=5,mode=deferred',
+    'journal=wal,timeout=5,mode=immediate',
+]
+
+# Share of operations per kind
+MIX = {'book': 4, 'discharge': 2, 'read': 4}
+
+
+def parse_config(text):
+    values = dict(part.split('=', 1) for part in text.split(','))
+    config = {
+        'journal': values.pop('journal', 'delete').upper(),
+        'timeout': float(values.pop('timeout', 5)),
+        'mode': values.pop('mode', 'deferred').upper(),
+    }
+    if values:
+        raise CommandError(f"unknown setting(s) {', '.join(values)} in --config {text!r}")
+    if config['journal'] not in ('DELETE', 'WAL', 'TRUNCATE', 'PERSIST', 'MEMORY'):
+        raise CommandError(f"unsupported journal mode in {text!r}")
+    if config['mode'] not in ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE'):
+        raise CommandError(f"unsupported transaction mode in {text!r}")
+    return config
+
+
+def use_database(path, config=None):
+    # Point 'default' at path; new connections pick the settings up
+    connections.close_all()
+    database = connections.settings['default']
+    database['NAME'] = path
+    database['OPTIONS'] = {} if config is None else {
+        'timeout': config['timeout'], 'transaction_mode': config['mode'],
+    }
+
+
+def run_worker(job):
+    """
+    Run job['threads'] threads doing job['ops'] operations each against the
+    views, in this process. Returns a list of (kind, seconds, outcome) and a
+    list of write statement durations. Also the entry point of worker processes.
+    """
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        # A spawned process starts from scratch; forked ones inherit the command's settings
+        django.setup()
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    from django.test import Client
+
+    use_database(job['path'], job['config'])
+    # Failed requests are counted below; don't print a traceback for each
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    results, write_times = [], []
+    lock = threading.Lock()
+
+    def timed_writes(execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with lock:
+                write_times.append(time.perf_counter() - start)
+
+    def work(seed):
+        rng = random.Random(seed)
+        kinds = [kind for kind, weight in MIX.items() for _ in range(weight)]
+        admin, patients = Client(), Client()
+        admin.cookies[settings.SESSION_COOKIE_NAME] = job['admin_session']
+        with connection.execute_wrapper(timed_writes):
+            for _ in range(job['ops']):
+                kind = rng.choice(kinds)
+                patient_pk, session = rng.choice(job['patients'])
+                patients.cookies[settings.SESSION_COOKIE_NAME] = session
+                start = time.perf_counter()
+                try:
+                    if kind == 'book':
+                        response = patients.post('/patient-book-appointment/', {
+                            'description': 'load test', 'doctorId': rng.choice(job['doctors']), 'priority': 0,
+                        })
+                    elif kind == 'discharge':
+                        response = admin.post(f'/discharge-patient/{patient_pk}/', {
+                            'roomCharge': '100', 'doctorFee': '50', 'medicineCost': '10', 'OtherCharge': '0',
+                        })
+                        # Put the patient back so there is something to discharge next time
+                        admin.get(f'/readmit-patient/{patient_pk}/')
+                    elif rng.random() < 0.5:
+                        response = admin.get('/admin-dashboard/')
+                    else:
+                        response = patients.get('/patient-view-appointment/')
+                    outcome = 'error' if response.status_code >= 500 else 'ok'
+                except OperationalError as error:
+                    outcome = 'locked' if 'locked' in str(error) else 'error'
+                except Exception:
+                    outcome = 'error'
+                with lock:
+                    results.append((kind, time.perf_counter() - start, outcome))
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=job['threads']) as pool:
+        list(pool.map(work, [job['seed'] * 1000 + n for n in range(job['threads'])]))
+    return results, write_times
+
+
+class Command(BaseCommand):
+    help = ('Drive concurrent bookings, discharges and page reads through the real views '
+            'from several threads and processes, on scratch copies of a seeded SQLite '
+            'database, and compare throughput, write lock waits and errors across '
+            'database configurations (journal mode, busy timeout, transaction mode).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--config', action='append',
+                            help='e.g. journal=wal,timeout=5,mode=immediate; repeat to compare '
+                                 '(default: %s)' % ' | '.join(DEFAULT_CONFIGS))
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8, help='threads per process')
+        parser.add_argument('--ops', type=int, default=50, help='operations per thread')
+        parser.add_argument('--patients', type=int, default=40)
+        parser.add_argument('--keep', action='store_true', help='keep the scratch databases')
+
+    def handle(self, *args, **options):
+        if connections.settings['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('load_writes compares SQLite configurations; the default database is not SQLite')
+        configs = [parse_config(text) for text in options['config'] or DEFAULT_CONFIGS]
+        original = dict(connections.settings['default'])
+        workdir = tempfile.mkdtemp(prefix='hms-load-')
+        # The test clients send Host: testserver
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                self.compare(workdir, configs, options)
+        finally:
+            connections.close_all()
+            connections.settings['default'].clear()
+            connections.settings['default'].update(original)
+            if options['keep']:
+                self.stdout.write(f"scratch databases kept in {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def compare(self, workdir, configs, options):
+        # Every configuration starts from a copy of the same seeded database
+        template = os.path.join(workdir, 'template.sqlite3')
+        fixtures = self.seed(template, options['patients'])
+        for number, config in enumerate(configs):
+            path = os.path.join(workdir, f'config{number}.sqlite3')
+            shutil.copyfile(template, path)
+            with sqlite3.connect(path) as db:
+                db.execute(f"PRAGMA journal_mode={config['journal']}")
+            self.report(config, *self.run(path, config, fixtures, options))
+
+    def seed(self, path, patient_count):
+        from django.test import Client
+        from hospital import episodes, models
+
+        use_database(path)
+        call_command('migrate', verbosity=0, interactive=False)
+        groups = {name: Group.objects.get_or_create(name=name)[0] for name in ('ADMIN', 'DOCTOR', 'PATIENT')}
+        admin = User.objects.create_user('load-admin', first_name='Load', last_name='Admin')
+        groups['ADMIN'].user_set.add(admin)
+        doctors = []
+        for n in range(5):
+            user = User.objects.create_user(f'load-doctor{n}', first_name=f'Doctor{n}', last_name='Load')
+            groups['DOCTOR'].user_set.add(user)
+            models.Doctor.objects.create(user=user, address='-', mobile='0', department='Cardiologist',
+                                         status=True, profile_pic='profile_pic/DoctorProfilePic/load.jpg')
+            doctors.append(user.id)
+        patients = []
+        for n in range(patient_count):
+            user = User.objects.create_user(f'load-patient{n}', first_name=f'Patient{n}', last_name='Load')
+            groups['PATIENT'].user_set.add(user)
+            patient = models.Patient.objects.create(user=user, address='-', mobile='0', symptoms='-', status=True,
+                                                    assignedDoctorId=doctors[n % len(doctors)],
+                                                    profile_pic='profile_pic/PatientProfilePic/load.jpg')
+            episodes.admit(patient)
+            patients.append((patient.id, self.session_for(Client, user)))
+        fixtures = {'admin_session': self.session_for(Client, admin), 'doctors': doctors, 'patients': patients}
+        connections.close_all()
+        return fixtures
+
+    def session_for(self, Client, user):
+        client = Client()
+        client.force_login(user)
+        return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def run(self, path, config, fixtures, options):
+        jobs = [dict(fixtures, path=path, config=config, threads=options['threads'], ops=options['ops'], seed=n)
+                for n in range(options['processes'])]
+        connections.close_all()
+        start = time.perf_counter()
+        if options['processes'] > 1:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+            with context.Pool(options['processes']) as pool:
+                outputs = pool.map(run_worker, jobs)
+        else:
+            outputs = [run_worker(jobs[0])]
+        elapsed = time.perf_counter() - start
+        results = [row for rows, _ in outputs for row in rows]
+        write_times = [t for _, times in outputs for t in times]
+        return elapsed, results, write_times
+
+    def report(self, config, elapsed, results, write_times):
+        self.stdout.write(
+            f"journal={config['journal'].lower()} timeout={config['timeout']:g}s mode={config['mode'].lower()}: "
+            f"{len(results)} ops in {elapsed:.2f}s -> {len(results) / elapsed:.1f} ops/s"
+        )
+        for kind in MIX:
+            rows = [row for row in results if row[0] == kind]
+            if not rows:
+                continue
+            latencies = sorted(seconds for _, seconds, _ in rows)
+            locked = sum(1 for row in rows if row[2] == 'locked')
+            errors = sum(1 for row in rows if row[2] == 'error')
+            self.stdout.write(
+                f"  {kind:<9} {len(rows):5d} ops  p50 {statistics.median(latencies) * 1000:7.1f}ms  "
+                f"p95 {latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000:7.1f}ms  "
+                f"locked {locked / len(rows):6.1%}  other errors {errors / len(rows):6.1%}"
+            )
+        if write_times:
+            write_times.sort()
+            self.stdout.write(
+                f"  write statements: {len(write_times)}, total {sum(write_times):.2f}s, "
+                f"p95 {write_times[max(0, int(len(write_times) * 0.95) - 1)] * 1000:.1f}ms, "
+                f"max {write_times[-1] * 1000:.1f}ms (time waiting for the write lock)"
+            )
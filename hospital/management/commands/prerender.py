@@ -0,0 +1,32 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from hospital import pagecache
+
+
+class Command(BaseCommand):
+    help = ('Write the pages that look the same to every anonymous visitor (home, about us, '
+            'role selection, logins) to static HTML, as <output>/<path>/index.html, for the '
+            'web server to serve without the application. Run again after changing them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'prerendered'))
+
+    def handle(self, *args, **options):
+        from django.test import Client
+
+        client = Client()
+        # The test client sends Host: testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for path in pagecache.page_paths():
+                response = client.get(path)
+                if not pagecache.cacheable(response):
+                    raise CommandError(f"{path} answered {response.status_code} or set cookies; not written")
+                directory = os.path.join(options['output'], path.strip('/'))
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, 'index.html'), 'wb') as page:
+                    page.write(response.content)
+                self.stdout.write(f"{path} -> {os.path.join(directory, 'index.html')}")
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hospital import sync
+
+
+class Command(BaseCommand):
+    help = ('Delete logged changes and tombstones older than --days. Offline clients whose '
+            'sync cursor is older than that have to reload their lists.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        pruned = sync.prune(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(f"pruned {pruned} changes")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from hospital import beds
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-ward daily occupancy counters from the finished bed assignments.'
+
+    def handle(self, *args, **options):
+        rows = beds.rebuild_occupancy()
+        self.stdout.write(f"wrote {rows} ward occupancy rows")
@@ -0,0 +1,34 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hospital import events
+
+
+class Command(BaseCommand):
+    help = ('Hand new domain events to the registered consumers (rollups, notifications) '
+            'in batches, recording each consumer\'s progress.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='keep running and poll for new events')
+        parser.add_argument('--interval', type=float, default=2.0, help='seconds to sleep when there is nothing to do')
+        parser.add_argument('--prune-days', type=int, help='also delete handled events older than this many days')
+
+    def handle(self, *args, **options):
+        while True:
+            handled = events.run_all(options['batch_size'])
+            if any(handled.values()):
+                self.stdout.write(', '.join(f"{name}: {n}" for name, n in handled.items() if n))
+            if not options['loop']:
+                # Drain everything that is settled, then stop
+                if any(handled.values()):
+                    continue
+                break
+            if not any(handled.values()):
+                time.sleep(options['interval'])
+        if options['prune_days'] is not None:
+            pruned = events.prune(timezone.now() - timedelta(days=options['prune_days']))
+            self.stdout.write(f"pruned {pruned} events")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hospital import outbox
+
+
+class Command(BaseCommand):
+    help = ('Deliver queued mail from the EmailOutbox table in batches over one SMTP '
+            'connection per batch, retrying failures with exponential backoff.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=outbox.MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help='keep running and poll for new mail')
+        parser.add_argument('--interval', type=float, default=5.0, help='seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.deliver_batch(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f"sent {sent}, failed {failed}")
+            if not options['loop']:
+                # Drain everything that is due, then stop
+                if sent or failed:
+                    continue
+                break
+            if not (sent or failed):
+                time.sleep(options['interval'])
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from hospital import namesync
+
+
+class Command(BaseCommand):
+    help = ('Rewrite the doctor and patient names copied onto appointments and discharge '
+            'records (live and archived) from the current user names.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = namesync.sync_user_names(batch_size=options['batch_size'])
+        self.stdout.write(f"updated {updated} rows")
@@ -0,0 +1,36 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Copy the primary SQLite database onto the replica file with the SQLite '
+            'online backup API. Lets the replica routing be tried locally.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='keep copying every --interval seconds')
+        parser.add_argument('--interval', type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE_ALIAS
+        if not alias:
+            raise CommandError('No replica configured; set HMS_REPLICA_DB to a SQLite file path.')
+        primary, replica = settings.DATABASES['default'], settings.DATABASES[alias]
+        for db in (primary, replica):
+            if db['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('sync_replica only handles SQLite; use your database replication instead.')
+
+        while True:
+            source = sqlite3.connect(str(primary['NAME']))
+            target = sqlite3.connect(str(replica['NAME']))
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+            self.stdout.write(f"copied {primary['NAME']} -> {replica['NAME']}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+import argparse
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from hospital import tenants
+
+
+class Command(BaseCommand):
+    help = ('Run another management command against one hospital\'s database, or against '
+            'every tenant in turn with "all", e.g. tenant_command north run_consumers --loop.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug')
+        parser.add_argument('command_name')
+        parser.add_argument('command_args', nargs=argparse.REMAINDER)
+
+    def handle(self, *args, **options):
+        slugs = tenants.tenant_slugs() if options['slug'] == 'all' else [options['slug']]
+        for slug in slugs:
+            if slug not in tenants.tenant_slugs():
+                raise CommandError(f"unknown tenant {slug!r}; create it with create_tenant")
+            if len(slugs) > 1:
+                self.stdout.write(f"== {slug}")
+            with tenants.use_tenant(slug):
+                call_command(options['command_name'], *options['command_args'])
@@ -0,0 +1,158 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.http import Http404
+from django.urls import get_script_prefix, set_script_prefix
+from django.utils.functional import SimpleLazyObject
+
+from . import authcache, pagecache, routers, tenants
+
+PIN_COOKIE = 'hms_pin_primary'
+
+
+class ReplicaPinningMiddleware:
+    """
+    Sets up per-request database routing. Views marked read_from_replica may
+    read from the replica; once a request has written to the primary, a
+    short-lived cookie pins that client to the primary for REPLICA_PIN_SECONDS
+    so it reads its own writes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self._begin(request)
+        try:
+            response = self.get_response(request)
+            return self._finish(response)
+        finally:
+            routers.end(token)
+
+    async def __acall__(self, request):
+        token = self._begin(request)
+        try:
+            response = await self.get_response(request)
+            return self._finish(response)
+        finally:
+            routers.end(token)
+
+    def _begin(self, request):
+        return routers.begin(pinned=PIN_COOKIE in request.COOKIES)
+
+    def _finish(self, response):
+        # Some views here still write on GET (approve/reject links), so pin on
+        # any write, not only on POST.
+        if routers.current_state().wrote and routers.replica_alias():
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
+
+
+class TenantMiddleware:
+    """
+    Picks the hospital for the request from its subdomain or /t/<slug>/ path
+    prefix (see tenants.resolve) and routes its queries to that hospital's
+    database. A path prefix is stripped before URL resolution and added back
+    to reversed URLs, so links stay inside the tenant.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, script_prefix = self._begin(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self._end(token, script_prefix)
+
+    async def __acall__(self, request):
+        token, script_prefix = self._begin(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            self._end(token, script_prefix)
+
+    def _begin(self, request):
+        slug, path_prefix = tenants.resolve(request)
+        request.tenant = slug
+        if slug is None:
+            return None, None
+        if slug not in tenants.tenant_slugs():
+            raise Http404("Unknown hospital")
+        script_prefix = get_script_prefix()
+        if path_prefix:
+            request.path_info = request.path_info[len(path_prefix):] or '/'
+            set_script_prefix(script_prefix.rstrip('/') + path_prefix + '/')
+        return tenants.begin(slug), script_prefix
+
+    def _end(self, token, script_prefix):
+        if token is not None:
+            tenants.end(token)
+            set_script_prefix(script_prefix)
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Answers anonymous requests for the pages marked with
+    pagecache.anonymous_cache from the cache, and stores them on a miss.
+    Goes before SessionMiddleware, so a hit skips sessions, auth and templates.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = pagecache.cache_key(request)
+        if key is None:
+            return self.get_response(request)
+        response = cache.get(key)
+        if response is None:
+            response = self.get_response(request)
+            if pagecache.cacheable(response):
+                cache.set(key, response, pagecache.PAGE_CACHE_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = pagecache.cache_key(request)
+        if key is None:
+            return await self.get_response(request)
+        response = await cache.aget(key)
+        if response is None:
+            response = await self.get_response(request)
+            if pagecache.cacheable(response):
+                await cache.aset(key, response, pagecache.PAGE_CACHE_SECONDS)
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware that takes the user and their roles from the
+    copy hospital.authcache keeps in the session, instead of loading them
+    from the database on every request (settings.AUTH_CACHE).
+    """
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: authcache.get_user(request))
+        request.auser = partial(authcache.auser, request)
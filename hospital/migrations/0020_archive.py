@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0019_feedback_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('patientId', models.PositiveIntegerField(null=True)),
+                ('doctorId', models.PositiveIntegerField(null=True)),
+                ('patientName', models.CharField(max_length=40, null=True)),
+                ('doctorName', models.CharField(max_length=40, null=True)),
+                ('description', models.TextField(max_length=500)),
+                ('status', models.BooleanField(default=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('appointmentDate', models.DateField(db_index=True)),
+                ('archivedAt', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPatientDischargeDetails',
+            fields=[
+                ('patientId', models.PositiveIntegerField(db_index=True, null=True)),
+                ('patientName', models.CharField(max_length=40)),
+                ('assignedDoctorName', models.CharField(max_length=40)),
+                ('address', models.CharField(max_length=40)),
+                ('mobile', models.CharField(max_length=20, null=True)),
+                ('symptoms', models.CharField(max_length=100, null=True)),
+                ('admitDate', models.DateField()),
+                ('releaseDate', models.DateField(db_index=True)),
+                ('daySpent', models.PositiveIntegerField()),
+                ('roomCharge', models.PositiveIntegerField()),
+                ('medicineCost', models.PositiveIntegerField()),
+                ('doctorFee', models.PositiveIntegerField()),
+                ('OtherCharge', models.PositiveIntegerField()),
+                ('total', models.PositiveIntegerField()),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('archivedAt', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='appointmentDate',
+            field=models.DateField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='patientdischargedetails',
+            name='patientId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='patientdischargedetails',
+            name='releaseDate',
+            field=models.DateField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0020_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('dailyRate', models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BillLineItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dischargeId', models.PositiveIntegerField(db_index=True)),
+                ('patientId', models.PositiveIntegerField(null=True)),
+                ('doctorId', models.PositiveIntegerField(null=True)),
+                ('department', models.CharField(blank=True, max_length=50)),
+                ('category', models.CharField(choices=[('room', 'Room'), ('doctor', 'Doctor Fee'), ('medicine', 'Medicine'), ('other', 'Other')], max_length=20)),
+                ('description', models.CharField(max_length=100)),
+                ('quantity', models.DecimalField(decimal_places=2, default=1, max_digits=10)),
+                ('unitPrice', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('billedOn', models.DateField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['billedOn', 'department'], name='hospital_bi_billedO_71aa92_idx'), models.Index(fields=['billedOn', 'doctorId'], name='hospital_bi_billedO_ce27db_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0021_billing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=5)),
+                ('periodStart', models.DateField()),
+                ('admissions', models.PositiveIntegerField(default=0)),
+                ('discharges', models.PositiveIntegerField(default=0)),
+                ('daysSpent', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'periodStart'), name='unique_admission_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=5)),
+                ('periodStart', models.DateField()),
+                ('department', models.CharField(max_length=50)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discharges', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'periodStart', 'department'), name='unique_revenue_rollup')],
+            },
+        ),
+    ]
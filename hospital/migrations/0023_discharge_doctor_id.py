@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:27
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_assigned_doctor_id(apps, schema_editor):
+    # Take the doctor from the patient record; for patients that no longer
+    # exist, fall back to the stored first name when only one doctor has it.
+    db = schema_editor.connection.alias
+    User = apps.get_model('auth', 'User')
+    Doctor = apps.get_model('hospital', 'Doctor')
+    Patient = apps.get_model('hospital', 'Patient')
+    for model_name in ('PatientDischargeDetails', 'ArchivedPatientDischargeDetails'):
+        model = apps.get_model('hospital', model_name)
+        doctor_id = Patient.objects.using(db).filter(id=OuterRef('patientId')).values('assignedDoctorId')[:1]
+        model.objects.using(db).filter(assignedDoctorId__isnull=True).update(assignedDoctorId=Subquery(doctor_id))
+        names = model.objects.using(db).filter(assignedDoctorId__isnull=True).values_list('assignedDoctorName', flat=True).distinct()
+        for name in list(names):
+            doctor_ids = list(User.objects.using(db).filter(
+                first_name=name, id__in=Doctor.objects.using(db).values('user_id')
+            ).values_list('id', flat=True)[:2])
+            if len(doctor_ids) == 1:
+                model.objects.using(db).filter(assignedDoctorId__isnull=True, assignedDoctorName=name).update(assignedDoctorId=doctor_ids[0])
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('hospital', '0022_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpatientdischargedetails',
+            name='assignedDoctorId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='patientdischargedetails',
+            name='assignedDoctorId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='doctorId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='patientId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedappointment',
+            name='doctorId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedappointment',
+            name='patientId',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.RunPython(fill_assigned_doctor_id, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:30
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def create_episodes(apps, schema_editor):
+    # Every discharge record is a closed stay; approved patients with no
+    # discharge record are still in hospital.
+    db = schema_editor.connection.alias
+    Patient = apps.get_model('hospital', 'Patient')
+    AdmissionEpisode = apps.get_model('hospital', 'AdmissionEpisode')
+    discharge_models = [apps.get_model('hospital', name)
+                        for name in ('PatientDischargeDetails', 'ArchivedPatientDischargeDetails')]
+    for model in discharge_models:
+        last_id = 0
+        while True:
+            rows = list(model.objects.using(db).filter(id__gt=last_id).order_by('id').values(
+                'id', 'patientId', 'assignedDoctorId', 'admitDate', 'releaseDate')[:1000])
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            AdmissionEpisode.objects.using(db).bulk_create([AdmissionEpisode(
+                patientId=row['patientId'], doctorId=row['assignedDoctorId'], admitted_at=row['admitDate'],
+                discharged_at=row['releaseDate'], dischargeId=row['id'],
+            ) for row in rows if row['patientId'] is not None])
+    admitted = Patient.objects.using(db).filter(status=True)
+    for model in discharge_models:
+        admitted = admitted.exclude(Exists(model.objects.using(db).filter(patientId=OuterRef('id'))))
+    AdmissionEpisode.objects.using(db).bulk_create([
+        AdmissionEpisode(patientId=row['id'], doctorId=row['assignedDoctorId'], admitted_at=row['admitDate'])
+        for row in admitted.values('id', 'assignedDoctorId', 'admitDate').iterator()
+    ], batch_size=1000)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0023_discharge_doctor_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='patient',
+            name='admitDate',
+            field=models.DateField(default=datetime.date.today),
+        ),
+        migrations.CreateModel(
+            name='AdmissionEpisode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patientId', models.PositiveIntegerField()),
+                ('doctorId', models.PositiveIntegerField(null=True)),
+                ('admitted_at', models.DateField()),
+                ('discharged_at', models.DateField(blank=True, null=True)),
+                ('dischargeId', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['patientId', 'admitted_at'], name='hospital_ad_patient_7f08d7_idx'), models.Index(fields=['discharged_at', 'admitted_at'], name='hospital_ad_dischar_2525f8_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('discharged_at__isnull', True)), fields=('patientId',), name='one_open_episode')],
+            },
+        ),
+        migrations.RunPython(create_episodes, migrations.RunPython.noop),
+    ]
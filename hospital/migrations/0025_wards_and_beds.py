@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0024_admission_episode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('department', models.CharField(blank=True, choices=[('Cardiologist', 'Cardiologist'), ('Dermatologists', 'Dermatologists'), ('Emergency Medicine Specialists', 'Emergency Medicine Specialists'), ('Allergists/Immunologists', 'Allergists/Immunologists'), ('Anesthesiologists', 'Anesthesiologists'), ('Colon and Rectal Surgeons', 'Colon and Rectal Surgeons')], max_length=50)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Bed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=20)),
+                ('active', models.BooleanField(default=True)),
+                ('ward', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='beds', to='hospital.ward')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WardOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wardId', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('occupied', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('wardId', 'day'), name='unique_ward_occupancy')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BedAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wardId', models.PositiveIntegerField()),
+                ('episodeId', models.PositiveIntegerField(db_index=True)),
+                ('patientId', models.PositiveIntegerField()),
+                ('start', models.DateField()),
+                ('end', models.DateField(blank=True, null=True)),
+                ('bed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hospital.bed')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wardId', 'end', 'start'], name='hospital_be_wardId_926591_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('end__isnull', True)), fields=('bed',), name='one_open_assignment_per_bed')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bed',
+            constraint=models.UniqueConstraint(fields=('ward', 'label'), name='unique_bed_label'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0025_wards_and_beds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='claimedBy',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='claimedUntil',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Routine'), (1, 'Soon'), (2, 'Urgent')], default=0),
+        ),
+        migrations.AddField(
+            model_name='archivedappointment',
+            name='claimedBy',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedappointment',
+            name='claimedUntil',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedappointment',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Routine'), (1, 'Soon'), (2, 'Urgent')], default=0),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status', False)), fields=['-priority', 'id'], name='pending_appointment_queue'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0027_domain_events'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='patient',
+            name='status',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'priority'], name='appointment_status_priority'),
+        ),
+    ]
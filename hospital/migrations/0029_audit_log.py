@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0028_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actorId', models.PositiveIntegerField(null=True)),
+                ('action', models.CharField(max_length=50)),
+                ('targetType', models.CharField(max_length=50)),
+                ('targetId', models.PositiveIntegerField(null=True)),
+                ('patientId', models.PositiveIntegerField(null=True)),
+                ('detail', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['actorId', 'created_at'], name='hospital_au_actorId_c85302_idx'), models.Index(fields=['patientId', 'created_at'], name='hospital_au_patient_a2275f_idx'), models.Index(fields=['created_at'], name='hospital_au_created_1ebab4_idx')],
+            },
+        ),
+    ]
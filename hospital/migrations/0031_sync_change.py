@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0030_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('objectId', models.PositiveBigIntegerField()),
+                ('doctorId', models.PositiveIntegerField(null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctorId', 'id'], name='hospital_sy_doctorI_4a69fa_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0031_sync_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'updated_at'], name='appointment_status_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['status', 'updated_at'], name='doctor_status_updated'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0032_list_version_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='doctor',
+            name='department',
+            field=models.CharField(choices=[('Cardiologist', 'Cardiologist'), ('Dermatologists', 'Dermatologists'), ('Emergency Medicine Specialists', 'Emergency Medicine Specialists'), ('Allergists/Immunologists', 'Allergists/Immunologists'), ('Anesthesiologists', 'Anesthesiologists'), ('Colon and Rectal Surgeons', 'Colon and Rectal Surgeons')], db_index=True, default='Cardiologist', max_length=50),
+        ),
+    ]
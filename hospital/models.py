@@ -1,7 +1,21 @@
+from datetime import date
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
 
 
+# updated_at is stamped by save() (auto_now) and, through this queryset, by
+# update() too, so every change to a row moves it; the API uses it for ETags.
+# Updates to the models in hospital.sync.SCOPES are also logged as SyncChanges.
+class TrackedQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        from . import sync  # sync imports this module
+        return sync.tracked_update(self, super().update, kwargs)
+
 
 departments=[('Cardiologist','Cardiologist'),
 ('Dermatologists','Dermatologists'),
@@ -15,8 +29,13 @@ class Doctor(models.Model):
     profile_pic= models.ImageField(upload_to='profile_pic/DoctorProfilePic/',null=True,blank=True)
     address = models.CharField(max_length=40)
     mobile = models.CharField(max_length=20,null=True)
-    department= models.CharField(max_length=50,choices=departments,default='Cardiologist')
+    department= models.CharField(max_length=50,choices=departments,default='Cardiologist',db_index=True)
     status=models.BooleanField(default=False)
+    updated_at=models.DateTimeField(auto_now=True)
+    objects=TrackedQuerySet.as_manager()
+    class Meta:
+        # Version of the doctor lists (count and latest change), from the index alone
+        indexes = [models.Index(fields=['status', 'updated_at'], name='doctor_status_updated')]
     @property
     def get_name(self):
         return self.user.first_name+" "+self.user.last_name
@@ -34,9 +53,11 @@ class Patient(models.Model):
     address = models.CharField(max_length=40)
     mobile = models.CharField(max_length=20,null=False)
     symptoms = models.CharField(max_length=100,null=False)
-    assignedDoctorId = models.PositiveIntegerField(null=True)
-    admitDate=models.DateField(auto_now=True)
-    status=models.BooleanField(default=False)
+    assignedDoctorId = models.PositiveIntegerField(null=True,db_index=True)
+    admitDate=models.DateField(default=date.today)  # start of the current admission, see AdmissionEpisode
+    status=models.BooleanField(default=False,db_index=True)
+    updated_at=models.DateTimeField(auto_now=True)
+    objects=TrackedQuerySet.as_manager()
     @property
     def get_name(self):
         return self.user.first_name+" "+self.user.last_name
@@ -47,27 +68,54 @@ class Patient(models.Model):
         return self.user.first_name+" ("+self.symptoms+")"
 
 
-class Appointment(models.Model):
-    patientId=models.PositiveIntegerField(null=True)
-    doctorId=models.PositiveIntegerField(null=True)
+# Fields shared by the live tables and their archive copies
+appointment_priorities=[(0,'Routine'),
+(1,'Soon'),
+(2,'Urgent')
+]
+
+class AppointmentBase(models.Model):
+    patientId=models.PositiveIntegerField(null=True,db_index=True)
+    doctorId=models.PositiveIntegerField(null=True,db_index=True)
     patientName=models.CharField(max_length=40,null=True)
     doctorName=models.CharField(max_length=40,null=True)
-    appointmentDate=models.DateField(auto_now=True)
+    appointmentDate=models.DateField(auto_now=True,db_index=True)
     description=models.TextField(max_length=500)
     status=models.BooleanField(default=False)
+    priority=models.PositiveSmallIntegerField(choices=appointment_priorities,default=0)
+    # Set while an admin is working on the request, see hospital/triage.py
+    claimedBy=models.PositiveIntegerField(null=True,blank=True)
+    claimedUntil=models.DateTimeField(null=True,blank=True)
+    class Meta:
+        abstract = True
+
+
+class Appointment(AppointmentBase):
+    updated_at=models.DateTimeField(auto_now=True)
+    objects=TrackedQuerySet.as_manager()
+    class Meta:
+        indexes = [
+            # The approval queue: pending requests, most urgent first, then oldest first
+            models.Index(fields=['-priority', 'id'], condition=models.Q(status=False), name='pending_appointment_queue'),
+            # Admin changelist filters
+            models.Index(fields=['status', 'priority'], name='appointment_status_priority'),
+            # Version of the appointment list, see views.common.list_version
+            models.Index(fields=['status', 'updated_at'], name='appointment_status_updated'),
+        ]
 
 
 
-class PatientDischargeDetails(models.Model):
-    patientId=models.PositiveIntegerField(null=True)
+class PatientDischargeDetailsBase(models.Model):
+    patientId=models.PositiveIntegerField(null=True,db_index=True)
     patientName=models.CharField(max_length=40)
+    assignedDoctorId=models.PositiveIntegerField(null=True,db_index=True)  # User id of the doctor
     assignedDoctorName=models.CharField(max_length=40)
     address = models.CharField(max_length=40)
     mobile = models.CharField(max_length=20,null=True)
     symptoms = models.CharField(max_length=100,null=True)
 
     admitDate=models.DateField(null=False)
-    releaseDate=models.DateField(null=False)
+    releaseDate=models.DateField(null=False,db_index=True)
     daySpent=models.PositiveIntegerField(null=False)
 
     roomCharge=models.PositiveIntegerField(null=False)
@@ -75,6 +123,147 @@ class PatientDischargeDetails(models.Model):
     doctorFee=models.PositiveIntegerField(null=False)
     OtherCharge=models.PositiveIntegerField(null=False)
     total=models.PositiveIntegerField(null=False)
+    class Meta:
+        abstract = True
+
+
+class PatientDischargeDetails(PatientDischargeDetailsBase):
+    updated_at=models.DateTimeField(auto_now=True)
+    objects=TrackedQuerySet.as_manager()
+
+
+# Archive tables: rows moved out of the live tables by `manage.py archive`.
+# They keep the original id so links and bills still resolve.
+class ArchivedAppointment(AppointmentBase):
+    id=models.BigIntegerField(primary_key=True)
+    appointmentDate=models.DateField(db_index=True)  # no auto_now, keep the original date
+    archivedAt=models.DateTimeField(auto_now_add=True)
+
+
+class ArchivedPatientDischargeDetails(PatientDischargeDetailsBase):
+    id=models.BigIntegerField(primary_key=True)
+    archivedAt=models.DateTimeField(auto_now_add=True)
+
+
+# One row per hospital stay, so readmissions keep their history.
+# discharged_at is null while the patient is still in hospital.
+class AdmissionEpisode(models.Model):
+    patientId = models.PositiveIntegerField()
+    doctorId = models.PositiveIntegerField(null=True)  # User id of the assigned doctor
+    admitted_at = models.DateField()
+    discharged_at = models.DateField(null=True, blank=True)
+    dischargeId = models.PositiveIntegerField(null=True, blank=True)  # PatientDischargeDetails id
+    class Meta:
+        indexes = [
+            models.Index(fields=['patientId', 'admitted_at']),
+            # "Who was in on day X" and "currently admitted" (discharged_at IS NULL) both
+            # start from discharged_at, then narrow on admitted_at inside the index
+            models.Index(fields=['discharged_at', 'admitted_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['patientId'], condition=models.Q(discharged_at__isnull=True), name='one_open_episode'),
+        ]
+
+# Wards and beds. A bed is held by one admission episode at a time.
+class Ward(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    department = models.CharField(max_length=50, choices=departments, blank=True)
+    def __str__(self):
+        return self.name
+
+
+class Bed(models.Model):
+    ward = models.ForeignKey(Ward, on_delete=models.CASCADE, related_name='beds')
+    label = models.CharField(max_length=20)
+    active = models.BooleanField(default=True)  # out of service beds are not offered
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['ward', 'label'], name='unique_bed_label')]
+    def __str__(self):
+        return "{} {}".format(self.ward.name, self.label)
+
+
+class BedAssignment(models.Model):
+    bed = models.ForeignKey(Bed, on_delete=models.CASCADE)
+    wardId = models.PositiveIntegerField()  # copied from the bed, for per-ward lookups
+    episodeId = models.PositiveIntegerField(db_index=True)  # AdmissionEpisode id
+    patientId = models.PositiveIntegerField()
+    start = models.DateField()
+    end = models.DateField(null=True, blank=True)  # null while the bed is taken
+    class Meta:
+        indexes = [models.Index(fields=['wardId', 'end', 'start'])]
+        constraints = [
+            models.UniqueConstraint(fields=['bed'], condition=models.Q(end__isnull=True), name='one_open_assignment_per_bed'),
+        ]
+
+
+# Beds occupied per ward and day by finished assignments, written when a bed
+# is released. Assignments still open are added on top at query time, so
+# availability never has to scan assignment history.
+class WardOccupancy(models.Model):
+    wardId = models.PositiveIntegerField()
+    day = models.DateField()
+    occupied = models.PositiveIntegerField(default=0)
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['wardId', 'day'], name='unique_ward_occupancy')]
+
+
+charge_categories=[('room','Room'),
+('doctor','Doctor Fee'),
+('medicine','Medicine'),
+('other','Other')
+]
+
+class RoomRate(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    dailyRate = models.DecimalField(max_digits=10, decimal_places=2)
+    def __str__(self):
+        return "{} ({}/day)".format(self.name, self.dailyRate)
+
+
+class BillLineItem(models.Model):
+    # Plain ids like the rest of the schema, so line items outlive archiving of the discharge row
+    dischargeId = models.PositiveIntegerField(db_index=True)
+    patientId = models.PositiveIntegerField(null=True)
+    doctorId = models.PositiveIntegerField(null=True)
+    # Department at billing time, so revenue stays with it if the doctor moves
+    department = models.CharField(max_length=50, blank=True)
+    category = models.CharField(max_length=20, choices=charge_categories)
+    description = models.CharField(max_length=100)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2, default=1)
+    unitPrice = models.DecimalField(max_digits=12, decimal_places=2)
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    billedOn = models.DateField()
+    class Meta:
+        indexes = [
+            models.Index(fields=['billedOn', 'department']),
+            models.Index(fields=['billedOn', 'doctorId']),
+        ]
+
+
+# Pre-aggregated analytics, kept up to date by hospital.rollups. Every day is
+# stored twice: once in its own 'day' bucket and once in its 'month' bucket,
+# so long date ranges can be answered from month rows.
+rollup_granularities=[('day','Day'),('month','Month')]
+
+class AdmissionRollup(models.Model):
+    granularity = models.CharField(max_length=5, choices=rollup_granularities)
+    periodStart = models.DateField()
+    admissions = models.PositiveIntegerField(default=0)
+    discharges = models.PositiveIntegerField(default=0)
+    daysSpent = models.PositiveIntegerField(default=0)  # summed over discharges, for the average
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['granularity', 'periodStart'], name='unique_admission_rollup')]
+
+
+class RevenueRollup(models.Model):
+    granularity = models.CharField(max_length=5, choices=rollup_granularities)
+    periodStart = models.DateField()
+    department = models.CharField(max_length=50)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discharges = models.PositiveIntegerField(default=0)
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['granularity', 'periodStart', 'department'], name='unique_revenue_rollup')]
+
 
 class Feedback(models.Model):
     name = models.CharField(max_length=100)
@@ -85,3 +274,83 @@ class Feedback(models.Model):
     def __str__(self):
         return f"{self.name} - {self.email}"
 
+
+
+class EmailOutbox(models.Model):
+    # Mail waiting to be delivered by `manage.py send_outbox`, so requests never wait on SMTP
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    feedback = models.ForeignKey(Feedback, on_delete=models.SET_NULL, null=True, blank=True)
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.TextField()  # comma separated
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # set while a worker is sending it
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    @property
+    def recipient_list(self):
+        return [r for r in self.recipients.split(',') if r]
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+
+# Durable event log written by the views, read by the consumers in
+# hospital/consumers.py (manage.py run_consumers). Ids only ever grow, so a
+# consumer's progress is the last id it has handled.
+class DomainEvent(models.Model):
+    type = models.CharField(max_length=50)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [models.Index(fields=['type', 'id'])]
+
+
+class ConsumerCheckpoint(models.Model):
+    consumer = models.CharField(max_length=50, unique=True)
+    lastEventId = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+# Who did what, for compliance. Rows are only ever added; hospital.audit
+# buffers them per process and writes them in batches.
+class AuditLog(models.Model):
+    actorId = models.PositiveIntegerField(null=True)  # User id, null for system actions
+    action = models.CharField(max_length=50)
+    targetType = models.CharField(max_length=50)
+    targetId = models.PositiveIntegerField(null=True)
+    patientId = models.PositiveIntegerField(null=True)  # Patient id the action concerns, if any
+    detail = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+    created_at = models.DateTimeField()  # when the action happened, not when the row was written
+    class Meta:
+        indexes = [
+            models.Index(fields=['actorId', 'created_at']),
+            models.Index(fields=['patientId', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+
+# One row per insert, update or delete of a patient, appointment or discharge
+# record, written with the change (hospital/sync.py). Ids only ever grow, so
+# the id of the last change a client has seen is its sync cursor; deletes are
+# kept as tombstones until pruned.
+class SyncChange(models.Model):
+    model = models.CharField(max_length=50)
+    objectId = models.PositiveBigIntegerField()
+    doctorId = models.PositiveIntegerField(null=True)  # User id of the doctor the row belongs to
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [models.Index(fields=['doctorId', 'id'])]
@@ -0,0 +1,94 @@
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+from . import models, tenants
+
+NAME_FIELDS = {'first_name', 'last_name'}
+
+
+def _user_first_name(id_field):
+    return Subquery(models.User.objects.filter(id=OuterRef(id_field)).values('first_name')[:1])
+
+
+def _patient_full_name(id_field):
+    # Same format as Patient.get_name
+    return Subquery(
+        models.Patient.objects.filter(id=OuterRef(id_field))
+        .values(name=Concat('user__first_name', Value(' '), 'user__last_name'))[:1]
+    )
+
+
+def _patient_ids(user_ids):
+    return list(models.Patient.objects.filter(user_id__in=user_ids).values_list('id', flat=True))
+
+
+# (model, copied name field, id field, name expression, maps changed user ids to id field values)
+TARGETS = []
+for _appointment_model in (models.Appointment, models.ArchivedAppointment):
+    TARGETS += [
+        (_appointment_model, 'doctorName', 'doctorId', _user_first_name, list),
+        (_appointment_model, 'patientName', 'patientId', _user_first_name, list),
+    ]
+for _discharge_model in (models.PatientDischargeDetails, models.ArchivedPatientDischargeDetails):
+    TARGETS += [
+        (_discharge_model, 'assignedDoctorName', 'assignedDoctorId', _user_first_name, list),
+        (_discharge_model, 'patientName', 'patientId', _patient_full_name, _patient_ids),
+    ]
+
+
+def sync_target(model, name_field, id_field, name_expression, ids=None, batch_size=1000):
+    """
+    Rewrite name_field from the current user names, batch_size rows per UPDATE.
+    ids limits the rows to those whose id_field is in ids; None checks every row.
+    Returns rows updated.
+    """
+    expression = name_expression(id_field)
+    stale = model.objects.exclude(**{f'{id_field}__isnull': True})
+    if ids is not None:
+        stale = stale.filter(**{f'{id_field}__in': ids})
+    # Rows whose person was deleted keep the name they were written with
+    stale = (stale.annotate(current_name=expression)
+             .filter(current_name__isnull=False)
+             .exclude(**{name_field: F('current_name')}))
+    updated = 0
+    last_id = 0
+    while True:
+        batch = list(stale.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1]
+        updated += model.objects.filter(id__in=batch).update(**{name_field: expression})
+    return updated
+
+
+def sync_user_names(user_ids=None, batch_size=1000):
+    """
+    Propagate the names of user_ids (every user when None) to the copies kept
+    on appointments and discharge records. Returns rows updated.
+    """
+    updated = 0
+    if user_ids is not None:
+        # Doctors and patients show the name through a join; stamp their updated_at
+        models.Doctor.objects.filter(user_id__in=user_ids).update()
+        models.Patient.objects.filter(user_id__in=user_ids).update()
+    for model, name_field, id_field, name_expression, map_ids in TARGETS:
+        ids = None if user_ids is None else map_ids(user_ids)
+        if ids == []:
+            continue
+        updated += sync_target(model, name_field, id_field, name_expression, ids, batch_size)
+    return updated
+
+
+def capture_old_name(sender, instance, update_fields=None, **kwargs):
+    instance._names_changed = False
+    if instance.pk is None or (update_fields is not None and not NAME_FIELDS & set(update_fields)):
+        return
+    old = sender.objects.filter(pk=instance.pk).values('first_name', 'last_name').first()
+    if old and (old['first_name'], old['last_name']) != (instance.first_name, instance.last_name):
+        instance._names_changed = True
+
+
+def schedule_name_sync(sender, instance, created=False, **kwargs):
+    if getattr(instance, '_names_changed', False):
+        user_id = instance.pk
+        tenants.on_commit(lambda: sync_user_names([user_id]))
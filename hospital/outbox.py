@@ -0,0 +1,106 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from . import models, tenants
+
+# Retry schedule: 30s, 1m, 2m, 4m ... capped at an hour, with some jitter
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+MAX_ATTEMPTS = 8
+# Workers claim their batch before sending it, so two never send the same
+# mail. A claim older than this is from a worker that died mid-batch.
+CLAIM_SECONDS = 600
+
+
+def queue_contact_message(name, email, message):
+    # Store the submission and its notification mail in one transaction; the
+    # worker command does the actual SMTP work.
+    with tenants.atomic():
+        feedback = models.Feedback.objects.create(name=name, email=email, message=message)
+        models.EmailOutbox.objects.create(
+            feedback=feedback,
+            subject=f"HMS contact form: {name}",
+            body=f"From: {name} <{email}>\n\n{message}",
+            from_email=settings.EMAIL_HOST_USER,
+            recipients=','.join(settings.EMAIL_RECEIVING_USER),
+        )
+    return feedback
+
+
+def queue_message(subject, body, recipients):
+    # Called inside the caller's transaction, like queue_contact_message
+    return models.EmailOutbox.objects.create(
+        subject=subject, body=body, from_email=settings.EMAIL_HOST_USER, recipients=','.join(recipients),
+    )
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _mark_failed_attempt(item, error, now, max_attempts):
+    item.attempts += 1
+    item.last_error = str(error)[:1000]
+    if item.attempts >= max_attempts:
+        item.status = models.EmailOutbox.FAILED
+    else:
+        item.next_attempt_at = now + retry_delay(item.attempts)
+
+
+def _claim(batch_size, now):
+    # Up to batch_size due messages, marked as this worker's in one short transaction
+    unclaimed = Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=CLAIM_SECONDS))
+    due = models.EmailOutbox.objects.filter(unclaimed, status=models.EmailOutbox.PENDING, next_attempt_at__lte=now)
+    with tenants.atomic():
+        ids = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+        due.filter(id__in=ids).update(claimed_at=now)
+    return list(models.EmailOutbox.objects.filter(id__in=ids, claimed_at=now).order_by('next_attempt_at', 'id'))
+
+
+def deliver_batch(batch_size=50, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Claim up to batch_size due messages and send them over a single SMTP
+    connection. Returns (sent, failed) counts for the batch.
+    """
+    now = timezone.now()
+    batch = _claim(batch_size, now)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as error:
+        # Mail server unreachable: back the whole batch off
+        for item in batch:
+            _mark_failed_attempt(item, error, now, max_attempts)
+        failed = len(batch)
+    else:
+        try:
+            for item in batch:
+                mail = EmailMessage(item.subject, item.body, item.from_email, item.recipient_list, connection=connection)
+                try:
+                    mail.send()
+                except Exception as error:
+                    _mark_failed_attempt(item, error, now, max_attempts)
+                    failed += 1
+                else:
+                    item.status = models.EmailOutbox.SENT
+                    item.sent_at = timezone.now()
+                    sent += 1
+        finally:
+            connection.close()
+
+    for item in batch:
+        item.claimed_at = None
+    models.EmailOutbox.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'claimed_at']
+    )
+    return sent, failed
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.urls import Resolver404, get_resolver, resolve, reverse
+
+from . import tenants
+
+# Whole-page cache for pages that look the same to every anonymous visitor.
+# AnonymousPageCacheMiddleware answers requests for them from the cache before
+# sessions, auth or templates are involved. Only requests without a session
+# cookie qualify, so logged-in users still get their redirects. The pages
+# carry no CSRF token; forms on them fetch one from /csrf-token/.
+PAGE_CACHE_SECONDS = 600
+
+
+def anonymous_cache(view_func):
+    # Marks a view for the page cache and `manage.py prerender`
+    view_func.anonymous_cache = True
+    return view_func
+
+
+def cache_key(request):
+    """
+    The cache key for request, or None when it must reach the view: not a
+    plain GET of a marked page, or from a visitor who may be logged in.
+    """
+    if request.method not in ('GET', 'HEAD') or request.META.get('QUERY_STRING'):
+        return None
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return None
+    try:
+        view_func = resolve(request.path_info).func
+    except Resolver404:
+        return None
+    if not getattr(view_func, 'anonymous_cache', False):
+        return None
+    # request.path includes a tenant's path prefix, which is in the page's links
+    return f'hms-page:{tenants.db()}:{request.path}'
+
+
+def cacheable(response):
+    # Nothing that belongs to one visitor: no cookies set, and a finished 200 page
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def page_paths():
+    # Paths of the marked pages, for prerendering
+    return [reverse(pattern.name) for pattern in get_resolver().url_patterns
+            if getattr(getattr(pattern, 'callback', None), 'anonymous_cache', False) and pattern.name]
@@ -0,0 +1,19 @@
+import io
+
+from django.http import HttpResponse
+from django.template.loader import get_template
+
+
+# Helper function to render PDF.
+# xhtml2pdf pulls in reportlab, html5lib and the font machinery, so it is only
+# imported the first time a bill is actually downloaded.
+def render_to_pdf(template_src, context_dict):
+    from xhtml2pdf import pisa
+
+    template = get_template(template_src)
+    html = template.render(context_dict)
+    result = io.BytesIO()
+    pdf = pisa.pisaDocument(io.BytesIO(html.encode("ISO-8859-1")), result)
+    if not pdf.err:
+        return HttpResponse(result.getvalue(), content_type='application/pdf')
+    return HttpResponse("Rendering Error", status=400)
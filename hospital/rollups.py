@@ -0,0 +1,155 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Sum
+
+from . import models, tenants
+
+DAY = 'day'
+MONTH = 'month'
+
+# Ranges up to this many days are charted per day, longer ones per month
+DAILY_SERIES_MAX_DAYS = 62
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+# Incremental maintenance, called by the rollups consumer (hospital/consumers.py) for admission and discharge events
+def _bump(model, lookup, day, increments):
+    updates = {field: F(field) + value for field, value in increments.items()}
+    for granularity, periodStart in ((DAY, day), (MONTH, month_start(day))):
+        key = dict(lookup, granularity=granularity, periodStart=periodStart)
+        if model.objects.filter(**key).update(**updates):
+            continue
+        try:
+            with tenants.atomic():
+                model.objects.create(**key, **increments)
+        except IntegrityError:
+            # Another request created the row first
+            model.objects.filter(**key).update(**updates)
+
+
+def record_admission(day):
+    _bump(models.AdmissionRollup, {}, day, {'admissions': 1})
+
+
+def record_discharge(releaseDate, daySpent, revenue, department):
+    _bump(models.AdmissionRollup, {}, releaseDate, {'discharges': 1, 'daysSpent': daySpent})
+    _bump(models.RevenueRollup, {'department': department or ''}, releaseDate, {'revenue': revenue, 'discharges': 1})
+
+
+# Range queries
+def range_filter(start, end):
+    """
+    Q selecting rollup rows that cover [start, end] exactly once: day rows
+    for the partial months at either end, month rows for whole months in
+    between. A range never touches more than ~62 day rows plus its months.
+    """
+    first_whole = start if start.day == 1 else next_month(start)
+    stop = month_start(end + timedelta(days=1))
+    if first_whole >= stop:
+        return Q(granularity=DAY, periodStart__range=(start, end))
+    return (
+        Q(granularity=DAY, periodStart__gte=start, periodStart__lt=first_whole)
+        | Q(granularity=MONTH, periodStart__gte=first_whole, periodStart__lt=stop)
+        | Q(granularity=DAY, periodStart__gte=stop, periodStart__lte=end)
+    )
+
+
+def admission_trend(start, end):
+    rows = (models.AdmissionRollup.objects.filter(range_filter(start, end))
+            .values('periodStart', 'admissions', 'discharges', 'daysSpent'))
+    daily = (end - start).days < DAILY_SERIES_MAX_DAYS
+    buckets = defaultdict(lambda: {'admissions': 0, 'discharges': 0, 'daysSpent': 0})
+    for row in rows:
+        period = row['periodStart'] if daily else month_start(row['periodStart'])
+        for field in ('admissions', 'discharges', 'daysSpent'):
+            buckets[period][field] += row[field]
+
+    # Fill the gaps so the chart has one point per period
+    series = []
+    period = start if daily else month_start(start)
+    while period <= end:
+        bucket = buckets[period]
+        bucket['period'] = period
+        bucket['avgDaysSpent'] = round(bucket['daysSpent'] / bucket['discharges'], 1) if bucket['discharges'] else 0
+        series.append(bucket)
+        period = period + timedelta(days=1) if daily else next_month(period)
+    return series
+
+
+def department_revenue(start, end):
+    return (models.RevenueRollup.objects.filter(range_filter(start, end))
+            .values('department')
+            .annotate(revenue=Sum('revenue'), discharges=Sum('discharges'))
+            .order_by('-revenue'))
+
+
+# Backfill: rebuild everything from the raw tables
+def _discharge_department():
+    # Department of the discharging doctor, for discharges billed before line items existed
+    return Subquery(models.Doctor.objects.filter(user_id=OuterRef('assignedDoctorId')).values('department')[:1])
+
+
+def backfill():
+    admissions = defaultdict(lambda: {'admissions': 0, 'discharges': 0, 'daysSpent': 0})
+    revenue = defaultdict(lambda: {'revenue': Decimal('0'), 'discharges': 0})
+
+    for row in models.AdmissionEpisode.objects.values('admitted_at').annotate(n=Count('id')):
+        admissions[row['admitted_at']]['admissions'] += row['n']
+
+    for discharge_model in (models.PatientDischargeDetails, models.ArchivedPatientDischargeDetails):
+        for row in discharge_model.objects.values('releaseDate').annotate(n=Count('id'), days=Sum('daySpent')):
+            admissions[row['releaseDate']]['discharges'] += row['n']
+            admissions[row['releaseDate']]['daysSpent'] += row['days']
+        unbilled = (discharge_model.objects
+                    .filter(~Exists(models.BillLineItem.objects.filter(dischargeId=OuterRef('id'))))
+                    .annotate(department=_discharge_department())
+                    .values('releaseDate', 'department')
+                    .annotate(revenue=Sum('total'), n=Count('id')))
+        for row in unbilled:
+            key = (row['releaseDate'], row['department'] or '')
+            revenue[key]['revenue'] += Decimal(row['revenue'])
+            revenue[key]['discharges'] += row['n']
+
+    billed = (models.BillLineItem.objects.values('billedOn', 'department')
+              .annotate(revenue=Sum('amount'), n=Count('dischargeId', distinct=True)))
+    for row in billed:
+        key = (row['billedOn'], row['department'])
+        revenue[key]['revenue'] += row['revenue']
+        revenue[key]['discharges'] += row['n']
+
+    admission_rows = _with_months(admissions, lambda day: {}, ('admissions', 'discharges', 'daysSpent'))
+    revenue_rows = _with_months(
+        revenue, lambda key: {'department': key[1]}, ('revenue', 'discharges'), day_of=lambda key: key[0],
+    )
+    with tenants.atomic():
+        models.AdmissionRollup.objects.all().delete()
+        models.RevenueRollup.objects.all().delete()
+        models.AdmissionRollup.objects.bulk_create(
+            [models.AdmissionRollup(**row) for row in admission_rows], batch_size=500)
+        models.RevenueRollup.objects.bulk_create(
+            [models.RevenueRollup(**row) for row in revenue_rows], batch_size=500)
+    return len(admission_rows), len(revenue_rows)
+
+
+def _with_months(per_day, extra_of, fields, day_of=lambda key: key):
+    # Turn {key: counters} into day rows plus the matching month rows
+    rows = {}
+    for key, counters in per_day.items():
+        day = day_of(key)
+        for granularity, periodStart in ((DAY, day), (MONTH, month_start(day))):
+            extra = extra_of(key)
+            row_key = (granularity, periodStart) + tuple(extra.values())
+            row = rows.setdefault(row_key, dict(extra, granularity=granularity, periodStart=periodStart, **{f: 0 for f in fields}))
+            for field in fields:
+                row[field] += counters[field]
+    return list(rows.values())
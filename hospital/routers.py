@@ -0,0 +1,141 @@
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.db import connections
+
+from . import tenants
+
+# Per-request routing state, set up by ReplicaPinningMiddleware. Outside a
+# request (management commands, shell) it is None and everything uses the
+# primary unless the code asks for the replica with use_replica().
+_routing = contextvars.ContextVar('hms_routing', default=None)
+
+# Apps whose reads always go to the primary: a lagging replica must never log
+# someone out right after they signed in.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+class RoutingState:
+    def __init__(self, use_replica=False, pinned=False):
+        self.use_replica = use_replica
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+
+
+def begin(use_replica=False, pinned=False):
+    return _routing.set(RoutingState(use_replica, pinned))
+
+
+def end(token):
+    _routing.reset(token)
+
+
+def current_state():
+    return _routing.get()
+
+
+@contextmanager
+def use_replica():
+    # For exports and reports outside the request cycle
+    token = begin(True)
+    try:
+        yield
+    finally:
+        end(token)
+
+
+@contextmanager
+def use_primary():
+    token = begin(False)
+    try:
+        yield
+    finally:
+        end(token)
+
+
+def read_from_replica(view_func):
+    # Marks a read-only view (list pages, reports, exports) as safe to serve
+    # from the replica. Only applies to GET/HEAD requests.
+    def _allow(request):
+        state = _routing.get()
+        if state is not None and request.method in ('GET', 'HEAD'):
+            state.use_replica = True
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            _allow(request)
+            return await view_func(request, *args, **kwargs)
+    else:
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            _allow(request)
+            return view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+class TenantRouter:
+    """
+    Sends every query to the current tenant's database. With no tenant set it
+    has no opinion and PrimaryReplicaRouter decides. Tenant databases have no
+    replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        return tenants.db() if tenants.current() else None
+
+    def db_for_write(self, model, **hints):
+        return tenants.db() if tenants.current() else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows of different hospitals are never related
+        dbs = {obj1._state.db, obj2._state.db}
+        if any(db and db.startswith(tenants.ALIAS_PREFIX) for db in dbs):
+            return len(dbs) == 1
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every tenant database gets the full schema, auth and sessions included
+        return None
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to 'default'. Reads go to the replica when one is
+    configured, the view is marked with read_from_replica, nothing has been written yet in this
+    request and the client isn't pinned to the primary after a recent write.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        state = _routing.get()
+        if not alias or state is None or not state.use_replica or state.pinned or state.wrote:
+            return 'default'
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return 'default'
+        # Reads inside a transaction must see that transaction's writes
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary and gets its schema from it
+        return db != replica_alias()
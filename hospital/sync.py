@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import events, models
+
+# Models whose changes are logged for offline clients, and the field naming
+# the doctor (user id) each row belongs to. A doctor's feed holds the changes
+# to their rows; a row moved to another doctor shows up in both feeds.
+SCOPES = {
+    models.Patient: 'assignedDoctorId',
+    models.Appointment: 'doctorId',
+    models.PatientDischargeDetails: 'assignedDoctorId',
+}
+PAGE_SIZE = 500
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def record(using, model, rows, deleted=False):
+    # rows: (id, doctor user id) pairs
+    models.SyncChange.objects.using(using).bulk_create([
+        models.SyncChange(model=model.__name__, objectId=object_id, doctorId=doctor_id, deleted=deleted)
+        for object_id, doctor_id in dict.fromkeys(rows)
+    ])
+
+
+def tracked_update(queryset, update, kwargs):
+    # TrackedQuerySet.update(): log the rows it touches, in the same transaction
+    scope = SCOPES.get(queryset.model)
+    if scope is None:
+        return update(**kwargs)
+    with transaction.atomic(using=queryset.db):
+        rows = list(queryset.values_list('id', scope))
+        updated = update(**kwargs)
+        if scope in kwargs:
+            moved = queryset.model.objects.using(queryset.db).filter(id__in=[row[0] for row in rows])
+            rows += moved.values_list('id', scope)
+        if rows:
+            record(queryset.db, queryset.model, rows)
+    return updated
+
+
+# Signal handlers, connected in HospitalConfig.ready()
+def capture_old_scope(sender, instance, using, update_fields=None, **kwargs):
+    scope = SCOPES[sender]
+    instance._sync_old_scope = None
+    if instance._state.adding or (update_fields is not None and scope not in update_fields):
+        return
+    instance._sync_old_scope = sender.objects.using(using).filter(pk=instance.pk).values_list(scope, flat=True).first()
+
+
+def row_saved(sender, instance, using, **kwargs):
+    doctor_id = getattr(instance, SCOPES[sender])
+    rows = [(instance.pk, doctor_id)]
+    old = getattr(instance, '_sync_old_scope', None)
+    if old is not None and old != doctor_id:
+        rows.append((instance.pk, old))
+    record(using, sender, rows)
+
+
+def row_deleted(sender, instance, using, **kwargs):
+    record(using, sender, [(instance.pk, getattr(instance, SCOPES[sender]))], deleted=True)
+
+
+def _settled():
+    # A change id handed out by a transaction that hasn't committed yet must
+    # not be passed by a cursor; as for consumers, give writers time to commit
+    return models.SyncChange.objects.filter(
+        created_at__lte=timezone.now() - timedelta(seconds=events.SETTLE_SECONDS))
+
+
+def cursor():
+    # Where a client that has just loaded everything starts following changes
+    return _settled().aggregate(last=Max('id'))['last'] or 0
+
+
+def changes_since(since, doctor_id=None, limit=PAGE_SIZE):
+    """
+    The next limit changes after cursor since, optionally only those to
+    doctor_id's rows. Returns ({model name: {id: deleted}}, new cursor, more);
+    a row changed several times is listed once, with its latest state.
+    Raises CursorExpired when changes after since have been pruned.
+    """
+    first = models.SyncChange.objects.aggregate(first=Min('id'))['first']
+    if first is not None and since < first - 1:
+        raise CursorExpired(since)
+    feed = _settled().filter(id__gt=since)
+    if doctor_id is not None:
+        feed = feed.filter(doctorId=doctor_id)
+    rows = list(feed.order_by('id').values_list('id', 'model', 'objectId', 'deleted')[:limit])
+    changed = {}
+    for _, model, object_id, deleted in rows:
+        changed.setdefault(model, {})[object_id] = deleted
+    return changed, rows[-1][0] if rows else since, len(rows) == limit
+
+
+def prune(before):
+    # Delete changes older than before; clients behind them have to reload.
+    # The newest change is kept, so there is always a first id to tell an
+    # expired cursor by.
+    last = models.SyncChange.objects.aggregate(last=Max('id'))['last']
+    return models.SyncChange.objects.filter(created_at__lt=before).exclude(id=last).delete()[0]
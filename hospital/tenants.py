@@ -0,0 +1,78 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Each hospital (tenant) has its own database, registered in settings as
+# 'tenant_<slug>'. The current tenant is set per request by TenantMiddleware,
+# or with use_tenant() in commands and the shell; with none set everything
+# uses 'default' as before.
+ALIAS_PREFIX = 'tenant_'
+PATH_PREFIX = '/t/'
+
+_tenant = contextvars.ContextVar('hms_tenant', default=None)
+
+
+def alias_for(slug):
+    return ALIAS_PREFIX + slug
+
+
+def tenant_slugs():
+    return sorted(alias[len(ALIAS_PREFIX):] for alias in settings.DATABASES if alias.startswith(ALIAS_PREFIX))
+
+
+def current():
+    return _tenant.get()
+
+
+def db():
+    # Database alias of the current tenant, for code that names a database itself
+    slug = _tenant.get()
+    return alias_for(slug) if slug else DEFAULT_DB_ALIAS
+
+
+def begin(slug):
+    return _tenant.set(slug)
+
+
+def end(token):
+    _tenant.reset(token)
+
+
+@contextmanager
+def use_tenant(slug):
+    if slug is not None and slug not in tenant_slugs():
+        raise LookupError(f"unknown tenant {slug!r}")
+    token = begin(slug)
+    try:
+        yield
+    finally:
+        end(token)
+
+
+# transaction.atomic()/on_commit() without using= always mean 'default'; use
+# these so transactions cover the current tenant's database.
+def atomic():
+    return transaction.atomic(using=db())
+
+
+def on_commit(func):
+    transaction.on_commit(func, using=db())
+
+
+def resolve(request):
+    """
+    Returns (slug, path prefix) named by the request: the first label of the
+    host under settings.TENANT_DOMAIN, or a /t/<slug>/ path prefix.
+    (None, '') when the request names no tenant.
+    """
+    domain = getattr(settings, 'TENANT_DOMAIN', '')
+    host = request.get_host().split(':')[0]
+    if domain and host.endswith('.' + domain):
+        return host[:-len(domain) - 1], ''
+    if request.path_info.startswith(PATH_PREFIX):
+        slug = request.path_info[len(PATH_PREFIX):].split('/', 1)[0]
+        if slug:
+            return slug, PATH_PREFIX + slug
+    return None, ''
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import Q, Subquery
+from django.utils import timezone
+
+from . import models, tenants
+
+# A claim lapses after this long, so requests held by an admin who walked away return to the queue
+CLAIM_SECONDS = 10 * 60
+PAGE_SIZE = 50
+
+
+def pending():
+    # Queue order; matches the pending_appointment_queue index
+    return models.Appointment.objects.filter(status=False).order_by('-priority', 'id')
+
+
+def page(after=None, size=PAGE_SIZE):
+    """
+    size pending requests following after=(priority, id) in queue order.
+    Keyset pagination, so deep pages cost the same as the first one.
+    """
+    queue = pending()
+    if after is not None:
+        priority, last_id = after
+        queue = queue.filter(Q(priority__lt=priority) | Q(priority=priority, id__gt=last_id))
+    return queue[:size]
+
+
+def _unclaimed(now):
+    return pending().filter(Q(claimedUntil__isnull=True) | Q(claimedUntil__lt=now))
+
+
+def claim_next(admin_id, n):
+    """
+    Claim the next n unclaimed pending requests for admin_id and return them
+    in queue order. Two admins claiming at the same time never get the same
+    request.
+    """
+    now = timezone.now()
+    until = now + timedelta(seconds=CLAIM_SECONDS)
+    with tenants.atomic():
+        if connections[tenants.db()].features.has_select_for_update_skip_locked:
+            # Rows another admin is claiming right now are skipped, not waited on
+            ids = list(_unclaimed(now).select_for_update(skip_locked=True).values_list('id', flat=True)[:n])
+        else:
+            # SQLite: a single UPDATE takes the write lock, so select and claim happen together
+            ids = Subquery(_unclaimed(now).values('id')[:n])
+        # Re-check the claim in the UPDATE itself in case a lapsed claim was just renewed
+        models.Appointment.objects.filter(id__in=ids).filter(
+            Q(claimedUntil__isnull=True) | Q(claimedUntil__lt=now)
+        ).update(claimedBy=admin_id, claimedUntil=until)
+    return list(pending().filter(claimedBy=admin_id, claimedUntil=until))
+
+
+def release(appointment_ids, admin_id):
+    # Hand requests back to the queue without deciding them
+    return models.Appointment.objects.filter(id__in=appointment_ids, claimedBy=admin_id).update(
+        claimedBy=None, claimedUntil=None,
+    )
@@ -0,0 +1,31 @@
+# Views are split by role; urls.py keeps referring to them as views.<name>.
+from .public import (
+    home_view, role_click_view, afterlogin_view, admin_signup_view, doctor_signup_view,
+    patient_signup_view, aboutus_view, contactus_view, csrf_token_view, custom_logout,
+)
+from .admin import (
+    admin_dashboard_view, admin_dashboard_widget_view, admin_doctor_view, admin_view_doctor_view,
+    delete_doctor_from_hospital_view, update_doctor_view, admin_add_doctor_view,
+    admin_approve_doctor_view, approve_doctor_view, reject_doctor_view,
+    admin_view_doctor_specialisation_view, admin_patient_view, admin_view_patient_view,
+    delete_patient_from_hospital_view, update_patient_view, admin_add_patient_view,
+    admin_approve_patient_view, approve_patient_view, reject_patient_view,
+    admin_discharge_patient_view, readmit_patient_view, discharge_patient_view, download_pdf_view,
+    admin_bed_availability_view, admin_audit_log_view,
+    admin_revenue_report_view, admin_discharge_stats_view, admin_analytics_view, admin_tenant_summary_view,
+    admin_appointment_view, admin_view_appointment_view, admin_add_appointment_view,
+    admin_approve_appointment_view, admin_claim_appointments_view, approve_appointment_view, reject_appointment_view,
+)
+from .doctor import (
+    doctor_dashboard_view, doctor_dashboard_widget_view, doctor_patient_view, doctor_view_patient_view, search_view,
+    doctor_view_discharge_patient_view, doctor_appointment_view,
+    doctor_view_appointment_view, doctor_appointment_events_view, doctor_delete_appointment_view,
+    delete_appointment_view,
+)
+from .patient import (
+    patient_dashboard_view, patient_appointment_view, patient_book_appointment_view,
+    patient_view_doctor_view, search_doctor_view, patient_view_appointment_view,
+    patient_discharge_view,
+)
+from .api import api_list_view, api_detail_view, api_batch_view, api_changes_view
+from .common import is_admin, is_doctor, is_patient
@@ -0,0 +1,706 @@
+from django.shortcuts import render, redirect, reverse
+from django.db import connections
+from django.db.models import Q, Count, Exists, OuterRef, Sum
+from django.contrib.auth.models import Group
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_POST
+from django.contrib.auth.decorators import login_required, user_passes_test
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import asyncio
+from asgiref.sync import sync_to_async
+from .. import archive, audit, beds, billing, episodes, events, forms, models, rollups, tenants, triage
+from ..pdf import render_to_pdf
+from ..routers import read_from_replica
+from ..writes import retry_on_lock
+from .common import (
+    is_admin, ais_admin, async_role_required, alist, patient_id_of_user, list_version, page_etag, render_if_modified,
+    widget_response, RECENT_ROWS,
+)
+
+
+# ADMIN RELATED VIEWS
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_dashboard_view(request):
+    # The shell; counts and tables come from admin_dashboard_widget_view
+    return render(request, 'hospital/admin_dashboard.html')
+
+
+async def _admin_counts():
+    # One aggregate query per table instead of two COUNTs each
+    status_counts = {'true': Count('id', filter=Q(status=True)), 'false': Count('id', filter=Q(status=False))}
+    doctor_counts = await models.Doctor.objects.aaggregate(**status_counts)
+    patient_counts = await models.Patient.objects.aaggregate(**status_counts)
+    return {
+        'doctorcount': doctor_counts['true'],
+        'pendingdoctorcount': doctor_counts['false'],
+        'patientcount': patient_counts['true'],
+        'pendingpatientcount': patient_counts['false'],
+    }
+
+
+async def _recent_doctors():
+    doctors = await alist(models.Doctor.objects.select_related('user').order_by('-id')[:RECENT_ROWS])
+    return render_to_string('hospital/admin_dashboard_doctor_rows.html', {'doctors': doctors})
+
+
+async def _recent_patients():
+    patients = await alist(models.Patient.objects.select_related('user').order_by('-id')[:RECENT_ROWS])
+    return render_to_string('hospital/admin_dashboard_patient_rows.html', {'patients': patients})
+
+
+ADMIN_WIDGETS = {
+    'counts': _admin_counts,
+    'recent-doctors': _recent_doctors,
+    'recent-patients': _recent_patients,
+}
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_dashboard_widget_view(request, widget):
+    if widget not in ADMIN_WIDGETS:
+        raise Http404(widget)
+    return await widget_response(f'admin:{widget}', ADMIN_WIDGETS[widget])
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+def admin_doctor_view(request):
+    return render(request, 'hospital/admin_doctor.html')
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_view_doctor_view(request):
+    doctors = models.Doctor.objects.filter(status=True)
+    version = await list_version(doctors)
+    return await render_if_modified(request, page_etag(request, version), 'hospital/admin_view_doctor.html', {
+        'doctors': doctors.select_related('user'), 'version': version,
+    })
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def delete_doctor_from_hospital_view(request, pk):
+    doctor = models.Doctor.objects.get(id=pk)
+    user = models.User.objects.get(id=doctor.user_id)
+    with tenants.atomic():
+        audit.record(request.user.id, 'delete', doctor, name=doctor.get_name)
+        user.delete()
+        doctor.delete()
+    return redirect('admin-view-doctor')
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def update_doctor_view(request, pk):
+    doctor = models.Doctor.objects.get(id=pk)
+    user = models.User.objects.get(id=doctor.user_id)
+    userForm = forms.DoctorUserForm(instance=user)
+    doctorForm = forms.DoctorForm(instance=doctor)
+    mydict = {'userForm': userForm, 'doctorForm': doctorForm}
+    if request.method == 'POST':
+        userForm = forms.DoctorUserForm(request.POST, instance=user)
+        doctorForm = forms.DoctorForm(request.POST, request.FILES, instance=doctor)
+        if userForm.is_valid() and doctorForm.is_valid():
+            user = userForm.save(commit=False)
+            user.set_password(userForm.cleaned_data['password'])
+            doctor = doctorForm.save(commit=False)
+            doctor.status = True
+            with tenants.atomic():
+                user.save()
+                doctor.save()
+            return redirect('admin-view-doctor')
+    return render(request, 'hospital/admin_update_doctor.html', context=mydict)
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def admin_add_doctor_view(request):
+    userForm = forms.DoctorUserForm()
+    doctorForm = forms.DoctorForm()
+    mydict = {'userForm': userForm, 'doctorForm': doctorForm}
+    if request.method == 'POST':
+        userForm = forms.DoctorUserForm(request.POST)
+        doctorForm = forms.DoctorForm(request.POST, request.FILES)
+        if userForm.is_valid() and doctorForm.is_valid():
+            user = userForm.save(commit=False)
+            user.set_password(userForm.cleaned_data['password'])
+            doctor = doctorForm.save(commit=False)
+            doctor.status = True
+            with tenants.atomic():
+                user.save()
+                doctor.user = user
+                doctor.save()
+                my_doctor_group, created = Group.objects.get_or_create(name='DOCTOR')
+                my_doctor_group.user_set.add(user)
+            return redirect('admin-view-doctor')
+    return render(request, 'hospital/admin_add_doctor.html', context=mydict)
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_approve_doctor_view(request):
+    doctors = await alist(models.Doctor.objects.filter(status=False).select_related('user'))
+    return render(request, 'hospital/admin_approve_doctor.html', {'doctors': doctors})
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def approve_doctor_view(request, pk):
+    doctor = models.Doctor.objects.get(id=pk)
+    doctor.status = True
+    with tenants.atomic():
+        doctor.save()
+        events.publish(events.DoctorApproved(doctorUserId=doctor.user_id))
+        audit.record(request.user.id, 'approve', doctor)
+    return redirect(reverse('admin-approve-doctor'))
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def reject_doctor_view(request, pk):
+    doctor = models.Doctor.objects.get(id=pk)
+    user = models.User.objects.get(id=doctor.user_id)
+    with tenants.atomic():
+        audit.record(request.user.id, 'reject', doctor, name=doctor.get_name)
+        user.delete()
+        doctor.delete()
+    return redirect('admin-approve-doctor')
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_view_doctor_specialisation_view(request):
+    doctors = await alist(models.Doctor.objects.filter(status=True).select_related('user'))
+    return render(request, 'hospital/admin_view_doctor_Specialisation.html', {'doctors': doctors})
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+def admin_patient_view(request):
+    return render(request, 'hospital/admin_patient.html')
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_view_patient_view(request):
+    patients = await alist(models.Patient.objects.filter(status=True).select_related('user'))
+    return render(request, 'hospital/admin_view_patient.html', {'patients': patients})
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def delete_patient_from_hospital_view(request, pk):
+    patient = models.Patient.objects.get(id=pk)
+    user = models.User.objects.get(id=patient.user_id)
+    with tenants.atomic():
+        audit.record(request.user.id, 'delete', patient, patient_id=patient.id, name=patient.get_name)
+        user.delete()
+        patient.delete()
+    return redirect('admin-view-patient')
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def update_patient_view(request, pk):
+    patient = models.Patient.objects.get(id=pk)
+    user = models.User.objects.get(id=patient.user_id)
+    userForm = forms.PatientUserForm(instance=user)
+    patientForm = forms.PatientForm(instance=patient)
+    mydict = {'userForm': userForm, 'patientForm': patientForm}
+    if request.method == 'POST':
+        userForm = forms.PatientUserForm(request.POST, instance=user)
+        patientForm = forms.PatientForm(request.POST, request.FILES, instance=patient)
+        if userForm.is_valid() and patientForm.is_valid():
+            user = userForm.save(commit=False)
+            user.set_password(userForm.cleaned_data['password'])
+            patient = patientForm.save(commit=False)
+            patient.status = True
+            patient.assignedDoctorId = request.POST.get('assignedDoctorId')
+            with tenants.atomic():
+                user.save()
+                patient.save()
+            return redirect('admin-view-patient')
+    return render(request, 'hospital/admin_update_patient.html', context=mydict)
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def admin_add_patient_view(request):
+    userForm = forms.PatientUserForm()
+    patientForm = forms.PatientForm()
+    wardForm = forms.AdmissionWardForm()
+    mydict = {'userForm': userForm, 'patientForm': patientForm, 'wardForm': wardForm}
+    if request.method == 'POST':
+        userForm = forms.PatientUserForm(request.POST)
+        patientForm = forms.PatientForm(request.POST, request.FILES)
+        wardForm = forms.AdmissionWardForm(request.POST)
+        if userForm.is_valid() and patientForm.is_valid() and wardForm.is_valid():
+            user = userForm.save(commit=False)
+            user.set_password(userForm.cleaned_data['password'])
+            patient = patientForm.save(commit=False)
+            patient.status = True
+            patient.assignedDoctorId = request.POST.get('assignedDoctorId')
+            ward = wardForm.cleaned_data['wardId']
+            with tenants.atomic():
+                user.save()
+                patient.user = user
+                patient.save()
+                episode = episodes.admit(patient)
+                audit.record(request.user.id, 'admit', episode, patient_id=patient.id)
+                if ward:
+                    # A full ward still admits the patient, just without a bed
+                    beds.assign(episode, ward.id, episode.admitted_at)
+                my_patient_group, created = Group.objects.get_or_create(name='PATIENT')
+                my_patient_group.user_set.add(user)
+            return redirect('admin-view-patient')
+    return render(request, 'hospital/admin_add_patient.html', context=mydict)
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_approve_patient_view(request):
+    patients = await alist(models.Patient.objects.filter(status=False).select_related('user'))
+    return render(request, 'hospital/admin_approve_patient.html', {'patients': patients})
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def approve_patient_view(request, pk):
+    patient = models.Patient.objects.get(id=pk)
+    patient.status = True
+    with tenants.atomic():
+        patient.save()
+        episode = episodes.admit(patient)
+        audit.record(request.user.id, 'approve', patient, patient_id=patient.id)
+        if episode:
+            audit.record(request.user.id, 'admit', episode, patient_id=patient.id)
+    return redirect(reverse('admin-approve-patient'))
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def reject_patient_view(request, pk):
+    patient = models.Patient.objects.get(id=pk)
+    user = models.User.objects.get(id=patient.user_id)
+    with tenants.atomic():
+        audit.record(request.user.id, 'reject', patient, patient_id=patient.id, name=patient.get_name)
+        user.delete()
+        patient.delete()
+    return redirect('admin-approve-patient')
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_discharge_patient_view(request):
+    # Patients in hospital can be discharged, the others readmitted
+    in_hospital = episodes.currently_admitted().filter(patientId=OuterRef('id'))
+    patients = await alist(models.Patient.objects.filter(status=True).select_related('user').annotate(admitted=Exists(in_hospital)))
+    return render(request, 'hospital/admin_discharge_patient.html', {'patients': patients})
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def readmit_patient_view(request, pk):
+    patient = models.Patient.objects.get(id=pk)
+    with tenants.atomic():
+        episode = episodes.admit(patient)
+        if episode:
+            audit.record(request.user.id, 'readmit', episode, patient_id=patient.id)
+    return redirect('admin-discharge-patient')
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def discharge_patient_view(request, pk):
+    patient = models.Patient.objects.get(id=pk)
+    episode = episodes.current(pk)
+    if episode is None:
+        return redirect('admin-discharge-patient')
+    days = (date.today() - episode.admitted_at).days
+    
+    # Use select_related for a single, more efficient query
+    assignedDoctor = models.User.objects.get(id=patient.assignedDoctorId)
+    
+    patientDict = {
+        'patientId': pk,
+        'name': patient.get_name,
+        'mobile': patient.mobile,
+        'address': patient.address,
+        'symptoms': patient.symptoms,
+        'admitDate': episode.admitted_at,
+        'todayDate': date.today(),
+        'day': days,
+        'assignedDoctorName': assignedDoctor.first_name,
+    }
+
+    if request.method == 'POST':
+        try:
+            roomRateId = request.POST.get('roomRate')
+            if roomRateId:
+                roomRate = models.RoomRate.objects.get(id=roomRateId)
+                dailyRate, roomName = roomRate.dailyRate, roomRate.name
+            else:
+                dailyRate, roomName = billing.parse_amount(request.POST['roomCharge']), 'Room'
+            items = billing.build_line_items(
+                days, dailyRate,
+                doctor_fee=billing.parse_amount(request.POST['doctorFee']),
+                medicine_cost=billing.parse_amount(request.POST['medicineCost']),
+                other_charge=billing.parse_amount(request.POST['OtherCharge']),
+                room_name=roomName,
+            )
+        except (ValueError, KeyError, models.RoomRate.DoesNotExist):
+            # Handle potential errors if POST data is missing or invalid
+            return HttpResponse("Invalid form submission.", status=400)
+
+        totals = billing.category_totals(items)
+        total = sum(totals.values())
+        patientDict.update({
+            'roomCharge': totals['room'],
+            'doctorFee': totals['doctor'],
+            'medicineCost': totals['medicine'],
+            'OtherCharge': totals['other'],
+            'total': total,
+            'lineItems': items,
+        })
+
+        department = models.Doctor.objects.filter(user_id=assignedDoctor.id).values_list('department', flat=True).first()
+        with tenants.atomic():
+            if not episodes.close(episode, date.today()):
+                return HttpResponse("Patient has already been discharged.", status=409)
+            beds.release(episode, episode.discharged_at)
+            pDD = models.PatientDischargeDetails(
+                patientId=pk,
+                patientName=patient.get_name,
+                assignedDoctorName=assignedDoctor.first_name,
+                assignedDoctorId=assignedDoctor.id,
+                address=patient.address,
+                mobile=patient.mobile,
+                symptoms=patient.symptoms,
+                admitDate=episode.admitted_at,
+                releaseDate=episode.discharged_at,
+                daySpent=days,
+                # The integer columns keep the per-category summary; line items hold the exact amounts
+                medicineCost=billing.whole_units(totals['medicine']),
+                roomCharge=billing.whole_units(totals['room']),
+                doctorFee=billing.whole_units(totals['doctor']),
+                OtherCharge=billing.whole_units(totals['other']),
+                total=billing.whole_units(total)
+            )
+            pDD.save()
+            models.AdmissionEpisode.objects.filter(id=episode.id).update(dischargeId=pDD.id)
+            billing.save_line_items(pDD, items, doctorId=assignedDoctor.id, department=department)
+            events.publish(events.PatientDischarged(
+                dischargeId=pDD.id, patientId=pk, doctorUserId=assignedDoctor.id, department=department or '',
+                releaseDate=pDD.releaseDate, daySpent=days, total=total,
+            ))
+            audit.record(request.user.id, 'discharge', pDD, patient_id=pk, episodeId=episode.id, total=total)
+        return render(request, 'hospital/patient_final_bill.html', context=patientDict)
+
+    patientDict['roomRates'] = models.RoomRate.objects.order_by('name')
+    return render(request, 'hospital/patient_generate_bill.html', context=patientDict)
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+def download_pdf_view(request, pk):
+    dischargeDetails = archive.latest_discharge(pk)
+
+    if dischargeDetails:
+        context = {
+            'patientName': dischargeDetails.patientName,
+            'assignedDoctorName': dischargeDetails.assignedDoctorName,
+            'address': dischargeDetails.address,
+            'mobile': dischargeDetails.mobile,
+            'symptoms': dischargeDetails.symptoms,
+            'admitDate': dischargeDetails.admitDate,
+            'releaseDate': dischargeDetails.releaseDate,
+            'daySpent': dischargeDetails.daySpent,
+            'medicineCost': dischargeDetails.medicineCost,
+            'roomCharge': dischargeDetails.roomCharge,
+            'doctorFee': dischargeDetails.doctorFee,
+            'OtherCharge': dischargeDetails.OtherCharge,
+            'total': dischargeDetails.total,
+        }
+        return render_to_pdf('hospital/download_bill.html', context)
+    else:
+        return HttpResponse("No discharge details found for this patient.", status=404)
+
+
+# Revenue report API: ?by=department|doctor|day&start=YYYY-MM-DD&end=YYYY-MM-DD
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_revenue_report_view(request):
+    report = billing.REVENUE_REPORTS.get(request.GET.get('by', 'department'))
+    if report is None:
+        return JsonResponse({'error': 'by must be one of: ' + ', '.join(billing.REVENUE_REPORTS)}, status=400)
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse({'error': 'start and end must be dates like 2024-01-31'}, status=400)
+    rows = await alist(report(start, end))
+    for row in rows:
+        # SQLite hands back SUM() of decimals unscaled
+        row['revenue'] = row['revenue'].quantize(billing.CENT)
+    return JsonResponse({'by': request.GET.get('by', 'department'), 'start': start, 'end': end, 'rows': rows})
+
+
+# Audit log, newest first: ?actor=<user id>&patient=<patient id>&since=&until=
+# (dates or date-times), ?before=<entry id> for the next page. Entries show up
+# once the process that recorded them has flushed its buffer (hospital/audit.py).
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_audit_log_view(request):
+    try:
+        actor = int(request.GET['actor']) if request.GET.get('actor') else None
+        patient = int(request.GET['patient']) if request.GET.get('patient') else None
+        before_id = int(request.GET['before']) if request.GET.get('before') else None
+    except ValueError:
+        return JsonResponse({'error': 'actor, patient and before must be ids'}, status=400)
+    try:
+        since, until = (_parse_moment(request.GET.get(name)) for name in ('since', 'until'))
+    except ValueError:
+        return JsonResponse({'error': 'since and until must be dates like 2024-01-31 or ISO date-times'}, status=400)
+    before = None
+    if before_id is not None:
+        created_at = await models.AuditLog.objects.filter(id=before_id).values_list('created_at', flat=True).afirst()
+        if created_at is None:
+            return JsonResponse({'error': 'before must be the id of an audit entry'}, status=400)
+        before = (created_at, before_id)
+    entries = await alist(audit.page(actor, patient, since, until, before).values(
+        'id', 'created_at', 'actorId', 'action', 'targetType', 'targetId', 'patientId', 'detail',
+    ))
+    more = len(entries) == audit.PAGE_SIZE
+    return JsonResponse({'entries': entries, 'next': entries[-1]['id'] if more else None})
+
+
+def _parse_moment(value):
+    # A date means the start of that day
+    if not value:
+        return None
+    moment = parse_datetime(value) or datetime.combine(date.fromisoformat(value), time.min)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+# Free beds per day: ?ward=<id>&start=YYYY-MM-DD&end=YYYY-MM-DD (default today)
+@read_from_replica
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+def admin_bed_availability_view(request):
+    try:
+        ward = models.Ward.objects.get(id=request.GET.get('ward'))
+    except (ValueError, models.Ward.DoesNotExist):
+        return JsonResponse({'error': 'ward must be a ward id'}, status=400)
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else date.today()
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else start
+    except ValueError:
+        return JsonResponse({'error': 'start and end must be dates like 2024-01-31'}, status=400)
+    if end < start or (end - start).days > 366 * 5:
+        return JsonResponse({'error': 'end must be after start and at most five years later'}, status=400)
+    result = beds.availability(ward.id, start, end)
+    return JsonResponse(dict(result, ward=ward.name, start=start, end=end))
+
+
+# Length-of-stay and cost distributions (NumPy); see hospital/analytics.py
+@read_from_replica
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+def admin_discharge_stats_view(request):
+    from .. import analytics  # keeps numpy out of the import path of every other view
+    return JsonResponse(analytics.discharge_stats())
+
+
+def _tenant_summary(slug):
+    # Runs in a worker thread with its own connection to the tenant's database
+    month_start = date.today().replace(day=1)
+    try:
+        with tenants.use_tenant(slug):
+            return {
+                'tenant': slug,
+                'doctors': models.Doctor.objects.filter(status=True).count(),
+                'inHospital': episodes.currently_admitted().count(),
+                'pendingAppointments': triage.pending().count(),
+                'revenueThisMonth': billing.billed_items(month_start, None).aggregate(total=Sum('amount'))['total'] or 0,
+            }
+    finally:
+        connections[tenants.alias_for(slug)].close()
+
+
+# Key figures of every hospital, read from all tenant databases at the same time
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_tenant_summary_view(request):
+    if request.tenant is not None:
+        return JsonResponse({'error': 'only available outside a hospital'}, status=404)
+    rows = await asyncio.gather(*[
+        sync_to_async(_tenant_summary, thread_sensitive=False)(slug) for slug in tenants.tenant_slugs()
+    ])
+    for row in rows:
+        row['revenueThisMonth'] = Decimal(row['revenueThisMonth']).quantize(billing.CENT)
+    return JsonResponse({'tenants': rows})
+
+
+# Trend charts from the rollup tables: ?start=YYYY-MM-DD&end=YYYY-MM-DD (default last 30 days)
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_analytics_view(request):
+    try:
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else date.today()
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else end - timedelta(days=29)
+    except ValueError:
+        return HttpResponse("start and end must be dates like 2024-01-31", status=400)
+    if start > end:
+        start, end = end, start
+
+    trend = await sync_to_async(rollups.admission_trend)(start, end)
+    revenue = await alist(rollups.department_revenue(start, end))
+    # Bar widths for the tables, as a percentage of the largest value
+    peak = max([row['admissions'] for row in trend] + [1])
+    for row in trend:
+        row['width'] = round(100 * row['admissions'] / peak)
+    peak = max([row['revenue'] for row in revenue] + [1])
+    for row in revenue:
+        row['revenue'] = row['revenue'].quantize(billing.CENT)
+        row['width'] = round(100 * row['revenue'] / peak)
+
+    mydict = {
+        'start': start,
+        'end': end,
+        'trend': trend,
+        'revenue': revenue,
+        'monthly': (end - start).days >= rollups.DAILY_SERIES_MAX_DAYS,
+    }
+    return render(request, 'hospital/admin_analytics.html', context=mydict)
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+def admin_appointment_view(request):
+    return render(request, 'hospital/admin_appointment.html')
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_view_appointment_view(request):
+    appointments = models.Appointment.objects.filter(status=True)
+    version = await list_version(appointments)
+    return await render_if_modified(request, page_etag(request, version), 'hospital/admin_view_appointment.html', {
+        'appointments': appointments, 'version': version,
+    })
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def admin_add_appointment_view(request):
+    appointmentForm = forms.AppointmentForm()
+    mydict = {'appointmentForm': appointmentForm}
+    if request.method == 'POST':
+        appointmentForm = forms.AppointmentForm(request.POST)
+        if appointmentForm.is_valid():
+            appointment = appointmentForm.save(commit=False)
+            doctor = models.User.objects.get(id=request.POST.get('doctorId'))
+            patient = models.User.objects.get(id=request.POST.get('patientId'))
+            appointment.doctorId = doctor.id
+            appointment.patientId = patient.id
+            appointment.doctorName = doctor.first_name
+            appointment.patientName = patient.first_name
+            appointment.status = True
+            with tenants.atomic():
+                appointment.save()
+                # Booked by an admin, so approved straight away
+                events.publish(events.AppointmentApproved(
+                    appointmentId=appointment.id, patientUserId=appointment.patientId, doctorUserId=appointment.doctorId,
+                ))
+            return redirect('admin-view-appointment')
+    return render(request, 'hospital/admin_add_appointment.html', context=mydict)
+
+
+@read_from_replica
+@async_role_required(ais_admin, login_url='adminlogin')
+async def admin_approve_appointment_view(request):
+    # Most urgent first; ?after=<priority>-<id> pages on, ?mine=1 shows the requests you claimed
+    now = timezone.now()
+    if request.GET.get('mine'):
+        queue = triage.pending().filter(claimedBy=request.user.id, claimedUntil__gte=now)
+        appointments = await alist(queue[:triage.PAGE_SIZE])
+    else:
+        try:
+            after = tuple(int(part) for part in request.GET['after'].split('-')) if request.GET.get('after') else None
+        except ValueError:
+            after = None
+        appointments = await alist(triage.page(after))
+    for a in appointments:
+        a.claimedByOther = a.claimedBy not in (None, request.user.id) and a.claimedUntil >= now
+    mydict = {'appointments': appointments, 'mine': bool(request.GET.get('mine'))}
+    if len(appointments) == triage.PAGE_SIZE and not mydict['mine']:
+        mydict['next_after'] = '{}-{}'.format(appointments[-1].priority, appointments[-1].id)
+    return render(request, 'hospital/admin_approve_appointment.html', mydict)
+
+
+# Claim the next ?n= pending requests (POST). JSON for API clients, otherwise back to the queue.
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@require_POST
+@retry_on_lock
+def admin_claim_appointments_view(request):
+    try:
+        n = min(max(int(request.POST.get('n', 10)), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'n must be a number'}, status=400)
+    claimed = triage.claim_next(request.user.id, n)
+    if 'application/json' not in request.headers.get('Accept', ''):
+        return redirect(reverse('admin-approve-appointment') + '?mine=1')
+    return JsonResponse({'claimedUntil': claimed[0].claimedUntil if claimed else None, 'appointments': [{
+        'id': a.id, 'priority': a.get_priority_display(), 'doctorName': a.doctorName,
+        'patientName': a.patientName, 'description': a.description, 'appointmentDate': a.appointmentDate,
+    } for a in claimed]})
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def approve_appointment_view(request, pk):
+    appointment = models.Appointment.objects.get(id=pk)
+    appointment.status = True
+    appointment.claimedBy = appointment.claimedUntil = None
+    with tenants.atomic():
+        appointment.save()
+        events.publish(events.AppointmentApproved(
+            appointmentId=appointment.id, patientUserId=appointment.patientId, doctorUserId=appointment.doctorId,
+        ))
+        audit.record(request.user.id, 'approve', appointment, patient_id=patient_id_of_user(appointment.patientId))
+    return redirect(reverse('admin-approve-appointment'))
+
+
+@login_required(login_url='adminlogin')
+@user_passes_test(is_admin)
+@retry_on_lock
+def reject_appointment_view(request, pk):
+    appointment = models.Appointment.objects.get(id=pk)
+    with tenants.atomic():
+        audit.record(request.user.id, 'reject', appointment, patient_id=patient_id_of_user(appointment.patientId))
+        events.publish(events.AppointmentDeleted(
+            appointmentId=appointment.id, patientUserId=appointment.patientId, doctorUserId=appointment.doctorId,
+        ))
+        appointment.delete()
+    return redirect('admin-approve-appointment')
@@ -0,0 +1,255 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_GET
+
+from .. import models, sync
+from ..routers import read_from_replica
+from .common import is_admin, is_doctor
+
+# JSON read API, /api/v1/. Session login; admins see everything, doctors their
+# own patients, appointments and discharges. Rows are serialized from
+# .values(), never from model instances.
+VERSION = 'v1'
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_IDS = 100
+MAX_CHANGES = 2000
+
+
+class Resource:
+    def __init__(self, model, fields, default_fields, doctor_scope):
+        self.model = model
+        self.fields = fields  # API name -> model field path
+        self.default_fields = default_fields
+        self.doctor_scope = doctor_scope  # doctor's user id -> filter kwargs
+
+    def queryset(self, user):
+        rows = self.model.objects.order_by('id')
+        if is_admin(user):
+            return rows
+        return rows.filter(**self.doctor_scope(user.id))
+
+    def select(self, names):
+        # names that match their field are selected as is, the rest under their API name
+        paths = [self.fields[name] for name in names if self.fields[name] == name]
+        renamed = {name: F(self.fields[name]) for name in names if self.fields[name] != name}
+        return paths, renamed
+
+
+RESOURCES = {
+    'doctors': Resource(
+        models.Doctor,
+        {'id': 'id', 'userId': 'user_id', 'firstName': 'user__first_name', 'lastName': 'user__last_name',
+         'department': 'department', 'mobile': 'mobile', 'address': 'address', 'status': 'status',
+         'updatedAt': 'updated_at'},
+        ('id', 'userId', 'firstName', 'lastName', 'department', 'status'),
+        lambda doctor_id: {'status': True},
+    ),
+    'patients': Resource(
+        models.Patient,
+        {'id': 'id', 'userId': 'user_id', 'firstName': 'user__first_name', 'lastName': 'user__last_name',
+         'mobile': 'mobile', 'address': 'address', 'symptoms': 'symptoms', 'assignedDoctorId': 'assignedDoctorId',
+         'admitDate': 'admitDate', 'status': 'status', 'updatedAt': 'updated_at'},
+        ('id', 'userId', 'firstName', 'lastName', 'symptoms', 'assignedDoctorId', 'admitDate', 'status'),
+        lambda doctor_id: {'assignedDoctorId': doctor_id},
+    ),
+    'appointments': Resource(
+        models.Appointment,
+        {'id': 'id', 'patientId': 'patientId', 'doctorId': 'doctorId', 'patientName': 'patientName',
+         'doctorName': 'doctorName', 'appointmentDate': 'appointmentDate', 'description': 'description',
+         'status': 'status', 'priority': 'priority', 'updatedAt': 'updated_at'},
+        ('id', 'patientId', 'doctorId', 'patientName', 'doctorName', 'appointmentDate', 'status', 'priority'),
+        lambda doctor_id: {'doctorId': doctor_id},
+    ),
+    'discharges': Resource(
+        models.PatientDischargeDetails,
+        {'id': 'id', 'patientId': 'patientId', 'patientName': 'patientName', 'assignedDoctorId': 'assignedDoctorId',
+         'assignedDoctorName': 'assignedDoctorName', 'admitDate': 'admitDate', 'releaseDate': 'releaseDate',
+         'daySpent': 'daySpent', 'roomCharge': 'roomCharge', 'medicineCost': 'medicineCost',
+         'doctorFee': 'doctorFee', 'OtherCharge': 'OtherCharge', 'total': 'total', 'updatedAt': 'updated_at'},
+        ('id', 'patientId', 'patientName', 'assignedDoctorId', 'admitDate', 'releaseDate', 'daySpent', 'total'),
+        lambda doctor_id: {'assignedDoctorId': doctor_id},
+    ),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_view(view_func):
+    # JSON errors instead of login redirects; admins and doctors only
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'login required'}, status=401)
+        if not (is_admin(request.user) or is_doctor(request.user)):
+            return JsonResponse({'error': 'admins and doctors only'}, status=403)
+        try:
+            response = view_func(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=error.status)
+        # Per user, and always revalidated with the ETag
+        patch_vary_headers(response, ['Cookie'])
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return _wrapped_view
+
+
+def _resource(name):
+    try:
+        return RESOURCES[name]
+    except KeyError:
+        raise ApiError(f"unknown resource {name!r}; one of: {', '.join(RESOURCES)}", status=404)
+
+
+def _fields(resource, value):
+    if not value:
+        return list(resource.default_fields)
+    names = [name for name in value.split(',') if name]
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown:
+        raise ApiError(f"unknown field(s) {', '.join(unknown)}; available: {', '.join(resource.fields)}")
+    return names
+
+
+def _ids(value):
+    try:
+        ids = sorted({int(part) for part in value.split(',') if part})
+    except ValueError:
+        raise ApiError('ids must be comma separated numbers')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ApiError(f'at most {MAX_BATCH_IDS} ids per resource')
+    return ids
+
+
+def _etag(*parts):
+    """
+    ETag from the (id, updated_at) pairs of the rows a response holds, which
+    come from a narrow query; the rows themselves are only read and
+    serialized when the client's copy is out of date.
+    """
+    digest = hashlib.sha1(json.dumps([VERSION, *parts], cls=DjangoJSONEncoder).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _rows(resource, queryset, names):
+    paths, renamed = resource.select(names)
+    # values() puts the renamed fields last; keep the order the client asked for
+    return [{name: row[name] for name in names} for row in queryset.values(*paths, **renamed)]
+
+
+def _not_modified(request, etag):
+    return get_conditional_response(request, etag=etag)
+
+
+# /api/v1/<resource>/?fields=a,b&after=<id>&limit=<n>: rows in id order,
+# keyset paged; "next" is the after= value of the following page
+@read_from_replica
+@require_GET
+@api_view
+def api_list_view(request, resource):
+    resource = _resource(resource)
+    names = _fields(resource, request.GET.get('fields'))
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError('after and limit must be numbers')
+    page = resource.queryset(request.user).filter(id__gt=after)
+    marks = list(page.values_list('id', 'updated_at')[:limit])
+    next_after = marks[-1][0] if len(marks) == limit else None
+    etag = _etag(names, marks, next_after)
+    response = _not_modified(request, etag)
+    if response is None:
+        rows = _rows(resource, page.filter(id__in=[id for id, _ in marks]), names) if marks else []
+        response = JsonResponse({'results': rows, 'next': next_after})
+    response['ETag'] = etag
+    return response
+
+
+@read_from_replica
+@require_GET
+@api_view
+def api_detail_view(request, resource, pk):
+    resource = _resource(resource)
+    names = _fields(resource, request.GET.get('fields'))
+    row = resource.queryset(request.user).filter(id=pk)
+    marks = list(row.values_list('id', 'updated_at'))
+    if not marks:
+        raise ApiError('not found', status=404)
+    etag = _etag(names, marks)
+    response = _not_modified(request, etag)
+    if response is None:
+        response = JsonResponse(_rows(resource, row, names)[0])
+    response['ETag'] = etag
+    return response
+
+
+# Many resources in one round trip:
+# /api/v1/batch/?patients=1,2,3&appointments=7,8&patients.fields=id,firstName
+# Ids that don't exist or aren't visible are left out.
+@read_from_replica
+@require_GET
+@api_view
+def api_batch_view(request):
+    wanted = {name: _ids(request.GET[name]) for name in RESOURCES if request.GET.get(name)}
+    unknown = [key for key in request.GET if key not in RESOURCES and key.split('.')[0] not in RESOURCES]
+    if unknown or not wanted:
+        raise ApiError(f"ask for one or more of {', '.join(RESOURCES)}, e.g. ?patients=1,2,3")
+    selections = {}
+    for name, ids in wanted.items():
+        resource = RESOURCES[name]
+        queryset = resource.queryset(request.user).filter(id__in=ids)
+        selections[name] = (resource, queryset, _fields(resource, request.GET.get(f'{name}.fields')))
+    marks = {name: list(queryset.values_list('id', 'updated_at')) for name, (_, queryset, _) in selections.items()}
+    etag = _etag({name: names for name, (_, _, names) in selections.items()}, marks)
+    response = _not_modified(request, etag)
+    if response is None:
+        response = JsonResponse({name: _rows(resource, queryset, names)
+                                 for name, (resource, queryset, names) in selections.items()})
+    response['ETag'] = etag
+    return response
+
+
+# Delta sync for offline clients. /api/v1/changes/ gives the current cursor;
+# load the lists, then ask for ?since=<cursor> to get the rows changed after
+# it, and the ids of rows deleted (or no longer visible), until "more" is
+# false. 410 means the cursor is too old: load the lists again.
+@read_from_replica
+@require_GET
+@api_view
+def api_changes_view(request):
+    if 'since' not in request.GET:
+        return JsonResponse({'cursor': sync.cursor()})
+    try:
+        since = int(request.GET['since'])
+        limit = min(max(int(request.GET.get('limit', sync.PAGE_SIZE)), 1), MAX_CHANGES)
+    except ValueError:
+        raise ApiError('since and limit must be numbers')
+    doctor_id = None if is_admin(request.user) else request.user.id
+    try:
+        changed, cursor, more = sync.changes_since(since, doctor_id, limit)
+    except sync.CursorExpired:
+        raise ApiError('cursor expired, reload the lists and start from /api/v1/changes/', status=410)
+    resources = {resource.model.__name__: name for name, resource in RESOURCES.items()}
+    rows, deleted = {}, {}
+    for model, states in changed.items():
+        name = resources[model]
+        resource = RESOURCES[name]
+        names = _fields(resource, request.GET.get(f'{name}.fields'))
+        if 'id' not in names:
+            names.insert(0, 'id')  # needed to merge the rows
+        live = [object_id for object_id, gone in states.items() if not gone]
+        rows[name] = _rows(resource, resource.queryset(request.user).filter(id__in=live), names) if live else []
+        found = {row['id'] for row in rows[name]}
+        deleted[name] = [object_id for object_id in states if object_id not in found]
+    return JsonResponse({'changed': rows, 'deleted': deleted, 'cursor': cursor, 'more': more})
@@ -0,0 +1,126 @@
+import hashlib
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.urls import get_script_prefix
+from django.utils.cache import get_conditional_response, patch_cache_control
+from functools import wraps
+from .. import models, tenants
+
+# Helper functions to check user roles. Users loaded by
+# CachedAuthenticationMiddleware carry their group names (hms_roles), so these
+# only query auth_user_groups for other users.
+def in_group(user, name):
+    roles = getattr(user, 'hms_roles', None)
+    if roles is not None:
+        return name in roles
+    return user.groups.filter(name=name).exists()
+
+async def ain_group(user, name):
+    roles = getattr(user, 'hms_roles', None)
+    if roles is not None:
+        return name in roles
+    return await user.groups.filter(name=name).aexists()
+
+def is_admin(user):
+    # A user can be an admin if they have the ADMIN group or staff status
+    return user.is_authenticated and (user.is_superuser or user.is_staff or in_group(user, 'ADMIN'))
+
+def is_doctor(user):
+    return in_group(user, 'DOCTOR')
+
+def is_patient(user):
+    return in_group(user, 'PATIENT')
+
+# Async versions of the role checks, used by the async (read-only) views
+async def ais_admin(user):
+    return user.is_authenticated and (user.is_superuser or user.is_staff or await ain_group(user, 'ADMIN'))
+
+async def ais_doctor(user):
+    return await ain_group(user, 'DOCTOR')
+
+async def ais_patient(user):
+    return await ain_group(user, 'PATIENT')
+
+# Async counterpart of login_required + user_passes_test.
+# Anonymous users go to login_url, users failing the role check go to LOGIN_URL,
+# the same as the stacked sync decorators do.
+def async_role_required(test_func, login_url):
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            user = await request.auser()
+            # Templates read request.user, so hand them the user we already loaded
+            # instead of letting the lazy object query again from async code.
+            request.user = user
+            if not user.is_authenticated:
+                return redirect_to_login(request.get_full_path(), login_url)
+            if not await test_func(user):
+                return redirect_to_login(request.get_full_path())
+            return await view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+# Evaluate a queryset from async code so templates never hit the database
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+# Appointments store the patient's User id; audit entries and episodes use the Patient id
+def patient_id_of_user(user_id):
+    return models.Patient.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+
+# Doctor templates loop over (appointment, patient) pairs
+async def appointments_with_patients(doctor_user_id, **filters):
+    appointments = await alist(models.Appointment.objects.filter(status=True, doctorId=doctor_user_id, **filters).order_by('-id'))
+    patient_ids = [a.patientId for a in appointments]
+    patients = {p.user_id: p async for p in models.Patient.objects.filter(user_id__in=patient_ids)}
+    return [(a, patients.get(a.patientId)) for a in appointments]
+
+# Conditional GET for list pages. A list's version is its row count and latest
+# updated_at: adding or changing a row moves the latter, deleting one the
+# former. Templates also cache the table body under it.
+async def list_version(queryset):
+    row = await queryset.aaggregate(count=Count('id'), last=Max('updated_at'))
+    return f"{row['count']}-{row['last'].timestamp() if row['last'] else 0}"
+
+def page_etag(request, *versions):
+    # Besides the lists, a page shows who is logged in and carries their CSRF token
+    parts = [request.path, request.user.id, request.user.first_name, request.META.get('CSRF_COOKIE'), *versions]
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+async def render_if_modified(request, etag, template_name, context):
+    """
+    304 when the browser has etag, otherwise the rendered page. Rendered in a
+    thread, so querysets in context are only run for fragments not in the cache.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await sync_to_async(render)(request, template_name, context)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+# Dashboard widgets. The dashboards render as a shell without the slow parts;
+# the browser then fetches every widget from its own endpoint, all at once.
+# Each widget is cached on its own for a few seconds, per hospital and path
+# prefix, and per doctor for a doctor's widgets.
+WIDGET_CACHE_SECONDS = 15
+# Rows in the "recent" tables; they used to list every row there is
+RECENT_ROWS = 20
+
+async def widget_response(key, build):
+    """
+    The widget under key, from the cache or from build(), a coroutine function
+    returning a dict (sent as JSON) or rendered HTML.
+    """
+    key = f'hms-widget:{tenants.db()}:{get_script_prefix()}:{key}'
+    content = await cache.aget(key)
+    if content is None:
+        content = await build()
+        await cache.aset(key, content, WIDGET_CACHE_SECONDS)
+    response = JsonResponse(content) if isinstance(content, dict) else HttpResponse(content)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,146 @@
+from django.shortcuts import render, redirect
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.contrib.auth.decorators import login_required, user_passes_test
+from .. import audit, events, live, models, tenants
+from ..routers import read_from_replica
+from ..writes import retry_on_lock
+from .common import (
+    is_doctor, ais_doctor, async_role_required, alist, appointments_with_patients, patient_id_of_user, widget_response,
+)
+
+
+# DOCTOR RELATED VIEWS
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_dashboard_view(request):
+    # The shell; counts and today's appointments come from doctor_dashboard_widget_view
+    doctor = await models.Doctor.objects.aget(user_id=request.user.id)
+    return render(request, 'hospital/doctor_dashboard.html', {'doctor': doctor})
+
+
+async def _doctor_counts(doctor_user_id):
+    return {
+        'appointmentcount': await models.Appointment.objects.filter(status=True, doctorId=doctor_user_id).acount(),
+        'patientcount': await models.Patient.objects.filter(status=True, assignedDoctorId=doctor_user_id).acount(),
+        'patientdischarged': await models.PatientDischargeDetails.objects.filter(assignedDoctorId=doctor_user_id).acount(),
+    }
+
+
+async def _todays_appointments(doctor_user_id):
+    appointments = await appointments_with_patients(doctor_user_id, appointmentDate=timezone.localdate())
+    return render_to_string('hospital/doctor_dashboard_appointment_rows.html', {'appointments': appointments})
+
+
+DOCTOR_WIDGETS = {
+    'counts': _doctor_counts,
+    'todays-appointments': _todays_appointments,
+}
+
+
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_dashboard_widget_view(request, widget):
+    if widget not in DOCTOR_WIDGETS:
+        raise Http404(widget)
+    doctor_user_id = request.user.id
+    return await widget_response(f'doctor:{doctor_user_id}:{widget}', lambda: DOCTOR_WIDGETS[widget](doctor_user_id))
+
+
+@login_required(login_url='doctorlogin')
+@user_passes_test(is_doctor)
+def doctor_patient_view(request):
+    doctor = models.Doctor.objects.get(user_id=request.user.id)
+    return render(request, 'hospital/doctor_patient.html', {'doctor': doctor})
+
+
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_view_patient_view(request):
+    patients = await alist(models.Patient.objects.filter(status=True, assignedDoctorId=request.user.id).select_related('user'))
+    doctor = await models.Doctor.objects.aget(user_id=request.user.id)
+    return render(request, 'hospital/doctor_view_patient.html', {'patients': patients, 'doctor': doctor})
+
+
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def search_view(request):
+    doctor = await models.Doctor.objects.aget(user_id=request.user.id)
+    query = request.GET.get('query', '')
+    patients = await alist(models.Patient.objects.filter(
+        status=True,
+        assignedDoctorId=request.user.id
+    ).filter(
+        Q(symptoms__icontains=query) | Q(user__first_name__icontains=query)
+    ).select_related('user'))
+    return render(request, 'hospital/doctor_view_patient.html', {'patients': patients, 'doctor': doctor})
+
+
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_view_discharge_patient_view(request):
+    dischargedpatients = await alist(models.PatientDischargeDetails.objects.filter(assignedDoctorId=request.user.id).distinct())
+    doctor = await models.Doctor.objects.aget(user_id=request.user.id)
+    return render(request, 'hospital/doctor_view_discharge_patient.html', {'dischargedpatients': dischargedpatients, 'doctor': doctor})
+
+
+@login_required(login_url='doctorlogin')
+@user_passes_test(is_doctor)
+def doctor_appointment_view(request):
+    doctor = models.Doctor.objects.get(user_id=request.user.id)
+    return render(request, 'hospital/doctor_appointment.html', {'doctor': doctor})
+
+
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_view_appointment_view(request):
+    doctor = await models.Doctor.objects.aget(user_id=request.user.id)
+    # Read before the appointments, so the live updates cover anything changed in between
+    last_event_id = await live.latest_event_id(tenants.db())
+    appointments = await appointments_with_patients(request.user.id)
+    return render(request, 'hospital/doctor_view_appointment.html', {
+        'appointments': appointments, 'doctor': doctor, 'last_event_id': last_event_id,
+    })
+
+
+# Server-sent events for doctor_view_appointment_view, see hospital/live.py
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_appointment_events_view(request):
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI every open stream would hold a worker; the page just doesn't update live
+        return HttpResponse(status=204)
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    try:
+        after = int(after) if after else None
+    except ValueError:
+        after = None
+    # The tenant is only set while the view runs, not while the response streams
+    response = StreamingHttpResponse(live.stream(tenants.db(), request.user.id, after), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # tell nginx not to buffer the stream
+    return response
+
+
+@read_from_replica
+@async_role_required(ais_doctor, login_url='doctorlogin')
+async def doctor_delete_appointment_view(request):
+    doctor = await models.Doctor.objects.aget(user_id=request.user.id)
+    appointments = await appointments_with_patients(request.user.id)
+    return render(request, 'hospital/doctor_delete_appointment.html', {'appointments': appointments, 'doctor': doctor})
+
+
+@login_required(login_url='doctorlogin')
+@user_passes_test(is_doctor)
+@retry_on_lock
+def delete_appointment_view(request, pk):
+    appointment = models.Appointment.objects.get(id=pk)
+    with tenants.atomic():
+        audit.record(request.user.id, 'delete', appointment, patient_id=patient_id_of_user(appointment.patientId))
+        events.publish(events.AppointmentDeleted(
+            appointmentId=appointment.id, patientUserId=appointment.patientId, doctorUserId=appointment.doctorId,
+        ))
+        appointment.delete()
+    return redirect('doctor-delete-appointment')
@@ -0,0 +1,125 @@
+from django.shortcuts import render, redirect
+from django.db.models import Q
+from django.contrib.auth.decorators import login_required, user_passes_test
+from .. import archive, episodes, events, forms, models, tenants
+from ..routers import read_from_replica
+from ..writes import retry_on_lock
+from .common import is_patient, ais_patient, async_role_required, alist, list_version, page_etag, render_if_modified
+
+
+# PATIENT RELATED VIEWS
+@read_from_replica
+@async_role_required(ais_patient, login_url='patientlogin')
+async def patient_dashboard_view(request):
+    patient = await models.Patient.objects.aget(user_id=request.user.id)
+    # select_related so doctor.get_name doesn't query from the template
+    doctor = await models.Doctor.objects.select_related('user').aget(user_id=patient.assignedDoctorId)
+    episode = await episodes.history(patient.id).afirst()
+    mydict = {
+        'patient': patient,
+        'doctorName': doctor.get_name,
+        'doctorMobile': doctor.mobile,
+        'doctorAddress': doctor.address,
+        'symptoms': patient.symptoms,
+        'doctorDepartment': doctor.department,
+        'admitDate': episode.admitted_at if episode else patient.admitDate,
+    }
+    return render(request, 'hospital/patient_dashboard.html', context=mydict)
+
+
+@login_required(login_url='patientlogin')
+@user_passes_test(is_patient)
+def patient_appointment_view(request):
+    patient = models.Patient.objects.get(user_id=request.user.id)
+    return render(request, 'hospital/patient_appointment.html', {'patient': patient})
+
+
+@login_required(login_url='patientlogin')
+@user_passes_test(is_patient)
+@retry_on_lock
+def patient_book_appointment_view(request):
+    appointmentForm = forms.PatientAppointmentForm()
+    patient = models.Patient.objects.get(user_id=request.user.id)
+    mydict = {'appointmentForm': appointmentForm, 'patient': patient, 'message': None}
+    if request.method == 'POST':
+        appointmentForm = forms.PatientAppointmentForm(request.POST)
+        if appointmentForm.is_valid():
+            appointment = appointmentForm.save(commit=False)
+            appointment.doctorId = request.POST.get('doctorId')
+            appointment.patientId = request.user.id
+            appointment.doctorName = models.User.objects.get(id=request.POST.get('doctorId')).first_name
+            appointment.patientName = request.user.first_name
+            appointment.status = False
+            with tenants.atomic():
+                appointment.save()
+                events.publish(events.AppointmentBooked(
+                    appointmentId=appointment.id, patientUserId=appointment.patientId,
+                    doctorUserId=int(appointment.doctorId), priority=appointment.priority,
+                ))
+            return redirect('patient-view-appointment')
+    return render(request, 'hospital/patient_book_appointment.html', context=mydict)
+
+
+@read_from_replica
+@async_role_required(ais_patient, login_url='patientlogin')
+async def patient_view_doctor_view(request):
+    doctors = models.Doctor.objects.filter(status=True)
+    patient = await models.Patient.objects.aget(user_id=request.user.id)
+    version = await list_version(doctors)
+    # The patient's picture is in the page chrome
+    etag = page_etag(request, version, patient.updated_at)
+    return await render_if_modified(request, etag, 'hospital/patient_view_doctor.html', {
+        'patient': patient, 'doctors': doctors.select_related('user'), 'version': version,
+    })
+
+
+@read_from_replica
+@async_role_required(ais_patient, login_url='patientlogin')
+async def search_doctor_view(request):
+    patient = await models.Patient.objects.aget(user_id=request.user.id)
+    query = request.GET.get('query', '')
+    doctors = models.Doctor.objects.filter(status=True).filter(
+        Q(department__icontains=query) | Q(user__first_name__icontains=query)
+    )
+    # Same template as the full list; the query keeps their cached rows apart
+    version = f'{await list_version(doctors)}:{query}'
+    etag = page_etag(request, version, patient.updated_at)
+    return await render_if_modified(request, etag, 'hospital/patient_view_doctor.html', {
+        'patient': patient, 'doctors': doctors.select_related('user'), 'version': version,
+    })
+
+
+@read_from_replica
+@async_role_required(ais_patient, login_url='patientlogin')
+async def patient_view_appointment_view(request):
+    patient = await models.Patient.objects.aget(user_id=request.user.id)
+    appointments = await alist(models.Appointment.objects.filter(patientId=request.user.id))
+    return render(request, 'hospital/patient_view_appointment.html', {'appointments': appointments, 'patient': patient})
+
+
+@login_required(login_url='patientlogin')
+@user_passes_test(is_patient)
+def patient_discharge_view(request):
+    patient = models.Patient.objects.get(user_id=request.user.id)
+    dischargeDetails = archive.latest_discharge(patient.id)
+
+    patientDict = {'is_discharged': False, 'patient': patient, 'patientId': request.user.id}
+    
+    if dischargeDetails:
+        patientDict.update({
+            'is_discharged': True,
+            'patientName': dischargeDetails.patientName,
+            'assignedDoctorName': dischargeDetails.assignedDoctorName,
+            'address': patient.address,
+            'mobile': patient.mobile,
+            'symptoms': patient.symptoms,
+            'admitDate': dischargeDetails.admitDate,
+            'releaseDate': dischargeDetails.releaseDate,
+            'daySpent': dischargeDetails.daySpent,
+            'medicineCost': dischargeDetails.medicineCost,
+            'roomCharge': dischargeDetails.roomCharge,
+            'doctorFee': dischargeDetails.doctorFee,
+            'OtherCharge': dischargeDetails.OtherCharge,
+            'total': dischargeDetails.total,
+        })
+    return render(request, 'hospital/patient_discharge.html', context=patientDict)
@@ -0,0 +1,154 @@
+from django.shortcuts import render, redirect
+from django.contrib.auth import logout
+from django.contrib.auth.models import Group
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseRedirect, JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
+from .. import forms, models, outbox, tenants
+from ..pagecache import anonymous_cache
+from ..writes import retry_on_lock
+from .common import is_admin, is_doctor, is_patient
+
+
+# Home view
+@anonymous_cache
+def home_view(request):
+    if request.user.is_authenticated:
+        return HttpResponseRedirect('afterlogin')
+    return render(request, 'hospital/index.html')
+
+
+# Combined view for user role selection
+@anonymous_cache
+def role_click_view(request, role):
+    if request.user.is_authenticated:
+        return HttpResponseRedirect('afterlogin')
+    # Use a dynamic template path based on the role
+    return render(request, f'hospital/{role}click.html')
+
+
+def account_approved(user, profile):
+    # Cached in the session along with the roles, see hospital/authcache.py
+    approved = getattr(user, 'hms_approved', None)
+    if approved is not None:
+        return approved
+    return profile.objects.filter(user_id=user.id, status=True).exists()
+
+
+# After login, redirect to the correct dashboard
+@login_required
+def afterlogin_view(request):
+    if is_admin(request.user):
+        return redirect('admin-dashboard')
+    elif is_doctor(request.user):
+        if account_approved(request.user, models.Doctor):
+            return redirect('doctor-dashboard')
+        else:
+            return render(request, 'hospital/doctor_wait_for_approval.html')
+    elif is_patient(request.user):
+        if account_approved(request.user, models.Patient):
+            return redirect('patient-dashboard')
+        else:
+            return render(request, 'hospital/patient_wait_for_approval.html')
+    # Fallback for authenticated users without a role to prevent redirect loop
+    return redirect('home')
+
+
+# Signup views
+@retry_on_lock
+def admin_signup_view(request):
+    form = forms.AdminSigupForm()
+    if request.method == 'POST':
+        form = forms.AdminSigupForm(request.POST)
+        if form.is_valid():
+            user = form.save(commit=False)
+            # Correct password handling
+            user.set_password(form.cleaned_data['password'])
+            user.is_staff = True  # Set is_staff to true for admin users
+            user.is_superuser = True # Set is_superuser for admin users
+            with tenants.atomic():
+                user.save()
+                my_admin_group, created = Group.objects.get_or_create(name='ADMIN')
+                my_admin_group.user_set.add(user)
+            return redirect('adminlogin')
+    return render(request, 'hospital/adminsignup.html', {'form': form})
+
+
+@retry_on_lock
+def doctor_signup_view(request):
+    userForm = forms.DoctorUserForm()
+    doctorForm = forms.DoctorForm()
+    mydict = {'userForm': userForm, 'doctorForm': doctorForm}
+    if request.method == 'POST':
+        userForm = forms.DoctorUserForm(request.POST)
+        doctorForm = forms.DoctorForm(request.POST, request.FILES)
+        if userForm.is_valid() and doctorForm.is_valid():
+            user = userForm.save(commit=False)
+            user.set_password(userForm.cleaned_data['password'])
+            doctor = doctorForm.save(commit=False)
+            # One transaction, so a failed step doesn't leave a user without a profile or group
+            with tenants.atomic():
+                user.save()
+                doctor.user = user
+                doctor.save()
+                my_doctor_group, created = Group.objects.get_or_create(name='DOCTOR')
+                my_doctor_group.user_set.add(user)
+            return redirect('doctorlogin')
+    return render(request, 'hospital/doctorsignup.html', context=mydict)
+
+
+@retry_on_lock
+def patient_signup_view(request):
+    userForm = forms.PatientUserForm()
+    patientForm = forms.PatientForm()
+    mydict = {'userForm': userForm, 'patientForm': patientForm}
+    if request.method == 'POST':
+        userForm = forms.PatientUserForm(request.POST)
+        patientForm = forms.PatientForm(request.POST, request.FILES)
+        if userForm.is_valid() and patientForm.is_valid():
+            user = userForm.save(commit=False)
+            user.set_password(userForm.cleaned_data['password'])
+            patient = patientForm.save(commit=False)
+            patient.assignedDoctorId = request.POST.get('assignedDoctorId')
+            with tenants.atomic():
+                user.save()
+                patient.user = user
+                patient.save()
+                my_patient_group, created = Group.objects.get_or_create(name='PATIENT')
+                my_patient_group.user_set.add(user)
+            return redirect('patientlogin')
+    return render(request, 'hospital/patientsignup.html', context=mydict)
+
+
+# ABOUT US AND CONTACT US VIEWS
+@anonymous_cache
+def aboutus_view(request):
+    return render(request, 'hospital/aboutus.html')
+
+
+# The login pages are cached and prerendered without a CSRF token; their
+# forms fetch one from here, which also sets the CSRF cookie
+@never_cache
+def csrf_token_view(request):
+    return JsonResponse({'token': get_token(request)})
+
+
+@retry_on_lock
+def contactus_view(request):
+    sub = forms.ContactusForm()
+    if request.method == 'POST':
+        sub = forms.ContactusForm(request.POST)
+        if sub.is_valid():
+            email = sub.cleaned_data['Email']
+            name = sub.cleaned_data['Name']
+            message = sub.cleaned_data['Message']
+            # Saved with an outbox row; `manage.py send_outbox` sends the mail
+            outbox.queue_contact_message(name, email, message)
+            return render(request, 'hospital/contactus_success.html', {'name': name})
+    return render(request, 'hospital/contactus.html', {'form': sub})
+
+
+def custom_logout(request):
+    logout(request)
+    return redirect('home')
@@ -0,0 +1,58 @@
+import functools
+import random
+import time
+
+from django.db import OperationalError, transaction
+
+from . import tenants
+
+# SQLite has one writer at a time. Transactions take the write lock at BEGIN
+# (transaction_mode IMMEDIATE in settings) and wait up to the busy timeout for
+# it; when that runs out the whole operation is tried again after a random
+# pause, so writers that collided don't all come back at the same moment.
+ATTEMPTS = 5
+BACKOFF_SECONDS = 0.05
+MAX_BACKOFF_SECONDS = 2
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return isinstance(error, OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def backoff(attempt):
+    # Anywhere between 0 and the exponential step ("full jitter")
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** attempt))
+
+
+def call_with_retry(func, using, attempts=ATTEMPTS):
+    """
+    func(), called again when it fails on the write lock of database using.
+    Inside an outer transaction on that database func runs once; that one is
+    the caller's to retry.
+    """
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError as error:
+            if (not is_lock_error(error) or attempt == attempts - 1
+                    or transaction.get_connection(using).in_atomic_block):
+                raise
+        time.sleep(backoff(attempt))
+
+
+def retry_on_lock(func=None, *, attempts=ATTEMPTS):
+    """
+    Call func again when it fails on the write lock. Safe when func writes in
+    a single transaction (or a single statement): a failed attempt then left
+    nothing behind. Keep that transaction to the writes themselves, after
+    validation and before rendering, so the lock is held briefly.
+    Writes go to the current tenant's database; code writing elsewhere uses
+    call_with_retry with its alias.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return call_with_retry(lambda: func(*args, **kwargs), tenants.db(), attempts)
+        return wrapper
+    return decorator if func is None else decorator(func)
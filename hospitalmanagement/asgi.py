@@ -3,8 +3,18 @@ ASGI config for hospitalmanagement project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The read-only pages (dashboards, list views and the search pages) are async
+views, so under an ASGI server they don't tie up a worker thread while waiting
+on the database. Run it with any ASGI server, for example:
+
+    uvicorn hospitalmanagement.asgi:application --workers 4
+    daphne hospitalmanagement.asgi:application
+
+Static files are not served by the ASGI app; put them behind the web server or
+run ``manage.py collectstatic`` and serve STATIC_ROOT.
+
 For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
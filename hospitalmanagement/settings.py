@@ -44,10 +44,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'hospital.middleware.TenantMiddleware',
+    'hospital.middleware.ReplicaPinningMiddleware',
+    'hospital.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'hospital.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,6 +68,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'hospital.context_processors.fragments',
             ],
         },
     },
@@ -76,13 +80,58 @@ WSGI_APPLICATION = 'hospitalmanagement.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite allows one writer at a time. WAL lets reads go on while a write
+# commits, the busy timeout (seconds) makes a writer wait for the lock instead
+# of failing at once, and IMMEDIATE transactions take the lock at BEGIN, so a
+# transaction never fails half-way because another one started writing first.
+# Views that write run their transaction through hospital.writes, which
+# retries it when the lock still can't be had.
+SQLITE_OPTIONS = {
+    'timeout': 5,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
+# Optional read replica. Views marked read_from_replica (list pages, reports,
+# exports) read from it; writes, and any read in a request after a write, go
+# to 'default'. To try it locally with two SQLite files, set
+# HMS_REPLICA_DB=replica.sqlite3 and keep it in sync with
+# `python manage.py sync_replica --loop`.
+REPLICA_DATABASE_ALIAS = None
+if os.environ.get('HMS_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['HMS_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASE_ALIAS = 'replica'
+
+# Several hospitals on one deployment: each hospital (tenant) has its own
+# database, tenants/<slug>.sqlite3, created with `python manage.py create_tenant <slug>`.
+# A request is served from a tenant's database when it comes in on
+# <slug>.<HMS_TENANT_DOMAIN> or under /t/<slug>/; other requests use 'default'.
+TENANT_DIR = Path(os.environ.get('HMS_TENANT_DIR', BASE_DIR / 'tenants'))
+TENANT_DOMAIN = os.environ.get('HMS_TENANT_DOMAIN', '')
+for _tenant_db in sorted(TENANT_DIR.glob('*.sqlite3')):
+    DATABASES['tenant_' + _tenant_db.stem] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _tenant_db,
+        'OPTIONS': SQLITE_OPTIONS,
+    }
+
+DATABASE_ROUTERS = ['hospital.routers.TenantRouter', 'hospital.routers.PrimaryReplicaRouter']
+
+# After a write, a client keeps reading from the primary for this many seconds
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,20 +176,49 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'static')
 
 
 # This setting tells Django where to redirect unauthenticated users for login.
-LOGIN_URL = '/patientlogin/'
+LOGIN_URL = 'patientlogin'
 
 # This setting redirects users to the afterlogin page after they have successfully logged in.
-LOGIN_REDIRECT_URL = '/afterlogin/'
+LOGIN_REDIRECT_URL = 'afterlogin'
+
+# Sessions and login checks. HMS_SESSION_ENGINE picks where sessions live:
+# 'cached_db' (the default: read from the cache, written through to the
+# database), 'db' (Django's default) or 'signed_cookies' (in the browser, no
+# server storage; contents are signed, not encrypted). With AUTH_CACHE the
+# user, their roles and approval are kept in the session too, so logged-in
+# page views don't query auth tables (hospital/authcache.py); HMS_AUTH_CACHE=0
+# loads the user on every request instead.
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[os.environ.get('HMS_SESSION_ENGINE', 'cached_db')]
+AUTH_CACHE = os.environ.get('HMS_AUTH_CACHE', '1') == '1'
+
+# The cache is per process unless HMS_REDIS_URL points at a shared Redis.
+# Run several worker processes with a shared cache, so a logout or role
+# change in one is seen by the others right away.
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+if os.environ.get('HMS_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['HMS_REDIS_URL'],
+    }
 
 # Default primary key field type to resolve model warnings
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # for contact us give your gmail id and password
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_USE_TLS = True
-EMAIL_PORT = 587
+# Mail is queued in the EmailOutbox table and sent by `python manage.py send_outbox --loop`.
+# To try it against a local SMTP stand-in:
+#   python -m aiosmtpd -n -l localhost:1025
+#   EMAIL_HOST=localhost EMAIL_PORT=1025 EMAIL_USE_TLS=0 python manage.py send_outbox
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_TIMEOUT = 10
 EMAIL_HOST_USER = 'from@gmail.com' # this email will be used to send emails
 EMAIL_HOST_PASSWORD = 'xyz' # host email password required
 # now sign in with your host gmail account in your browser
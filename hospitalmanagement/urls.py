@@ -6,6 +6,7 @@ NIT Agartala
 from django.contrib import admin
 from django.urls import path
 from hospital import views
+from hospital.pagecache import anonymous_cache
 from django.contrib.auth.views import LoginView
 
 urlpatterns = [
@@ -29,20 +30,22 @@ urlpatterns = [
     path('patientsignup/', views.patient_signup_view, name='patientsignup'),
 
     # Login Pages
-    path('adminlogin/', LoginView.as_view(
+    path('adminlogin/', anonymous_cache(LoginView.as_view(
         template_name='hospital/adminlogin.html',
         redirect_authenticated_user=True
-    ), name='adminlogin'),
+    )), name='adminlogin'),
 
-    path('doctorlogin/', LoginView.as_view(
+    path('doctorlogin/', anonymous_cache(LoginView.as_view(
         template_name='hospital/doctorlogin.html',
         redirect_authenticated_user=True
-    ), name='doctorlogin'),
+    )), name='doctorlogin'),
 
-    path('patientlogin/', LoginView.as_view(
+    path('patientlogin/', anonymous_cache(LoginView.as_view(
         template_name='hospital/patientlogin.html',
         redirect_authenticated_user=True
-    ), name='patientlogin'),
+    )), name='patientlogin'),
+
+    path('csrf-token/', views.csrf_token_view, name='csrf-token'),
 
     # After login and logout
     path('afterlogin/', views.afterlogin_view, name='afterlogin'),
@@ -52,6 +55,7 @@ urlpatterns = [
 
     # Admin Dashboard & Management
     path('admin-dashboard/', views.admin_dashboard_view, name='admin-dashboard'),
+    path('admin-dashboard/<str:widget>/', views.admin_dashboard_widget_view, name='admin-dashboard-widget'),
     path('admin-doctor/', views.admin_doctor_view, name='admin-doctor'),
     path('admin-view-doctor/', views.admin_view_doctor_view, name='admin-view-doctor'),
     path('delete-doctor-from-hospital/<int:pk>/', views.delete_doctor_from_hospital_view, name='delete-doctor-from-hospital'),
@@ -73,24 +77,34 @@ urlpatterns = [
     path('reject-patient/<int:pk>/', views.reject_patient_view, name='reject-patient'),
     path('admin-discharge-patient/', views.admin_discharge_patient_view, name='admin-discharge-patient'),
     path('discharge-patient/<int:pk>/', views.discharge_patient_view, name='discharge-patient'),
+    path('readmit-patient/<int:pk>/', views.readmit_patient_view, name='readmit-patient'),
+    path('admin-tenant-summary/', views.admin_tenant_summary_view, name='admin-tenant-summary'),
+    path('admin-audit-log/', views.admin_audit_log_view, name='admin-audit-log'),
+    path('admin-bed-availability/', views.admin_bed_availability_view, name='admin-bed-availability'),
     path('download-pdf/<int:pk>/', views.download_pdf_view, name='download-pdf'),
+    path('admin-revenue-report/', views.admin_revenue_report_view, name='admin-revenue-report'),
+    path('admin-analytics/', views.admin_analytics_view, name='admin-analytics'),
+    path('admin-discharge-stats/', views.admin_discharge_stats_view, name='admin-discharge-stats'),
 
     # Appointment Management
     path('admin-appointment/', views.admin_appointment_view, name='admin-appointment'),
     path('admin-view-appointment/', views.admin_view_appointment_view, name='admin-view-appointment'),
     path('admin-add-appointment/', views.admin_add_appointment_view, name='admin-add-appointment'),
     path('admin-approve-appointment/', views.admin_approve_appointment_view, name='admin-approve-appointment'),
+    path('admin-claim-appointments/', views.admin_claim_appointments_view, name='admin-claim-appointments'),
     path('approve-appointment/<int:pk>/', views.approve_appointment_view, name='approve-appointment'),
     path('reject-appointment/<int:pk>/', views.reject_appointment_view, name='reject-appointment'),
 
     # Doctor Dashboard & Management
     path('doctor-dashboard/', views.doctor_dashboard_view, name='doctor-dashboard'),
+    path('doctor-dashboard/<str:widget>/', views.doctor_dashboard_widget_view, name='doctor-dashboard-widget'),
     path('search/', views.search_view, name='search'),
     path('doctor-patient/', views.doctor_patient_view, name='doctor-patient'),
     path('doctor-view-patient/', views.doctor_view_patient_view, name='doctor-view-patient'),
     path('doctor-view-discharge-patient/', views.doctor_view_discharge_patient_view, name='doctor-view-discharge-patient'),
     path('doctor-appointment/', views.doctor_appointment_view, name='doctor-appointment'),
     path('doctor-view-appointment/', views.doctor_view_appointment_view, name='doctor-view-appointment'),
+    path('doctor-appointment-events/', views.doctor_appointment_events_view, name='doctor-appointment-events'),
     path('doctor-delete-appointment/', views.doctor_delete_appointment_view, name='doctor-delete-appointment'),
     path('delete-appointment/<int:pk>/', views.delete_appointment_view, name='delete-appointment'),
 
@@ -102,4 +116,10 @@ urlpatterns = [
     path('patient-view-doctor/', views.patient_view_doctor_view, name='patient-view-doctor'),
     path('searchdoctor/', views.search_doctor_view, name='searchdoctor'),
     path('patient-discharge/', views.patient_discharge_view, name='patient-discharge'),
+
+    # JSON read API
+    path('api/v1/batch/', views.api_batch_view, name='api-batch'),
+    path('api/v1/changes/', views.api_changes_view, name='api-changes'),
+    path('api/v1/<str:resource>/', views.api_list_view, name='api-list'),
+    path('api/v1/<str:resource>/<int:pk>/', views.api_detail_view, name='api-detail'),
 ]